@@ -1,7 +1,8 @@
+import os
 import time
 import numpy as np
 
-#.pyd file 
+#.pyd file
 import mc_engine_cpp # type: ignore
 
 # --- Version 1: Pure Python/NumPy Implementation ---
@@ -20,7 +21,7 @@ r = 0.05
 sigma = 0.2
 T = 1.0
 steps = 252
-num_simulations = 100_000 
+num_simulations = 100_000
 
 # --- Benchmark Python Version ---
 print(f"Running {num_simulations:,} simulations in pure Python...")
@@ -33,8 +34,8 @@ print(f"Python version took: {python_duration:.4f} seconds")
 
 print("-" * 30)
 
-# --- Benchmark C++ Version ---
-print(f"Running {num_simulations:,} simulations in C++...")
+# --- Benchmark C++ Version (one call per path) ---
+print(f"Running {num_simulations:,} simulations in C++, one call per path...")
 start_time_cpp = time.time()
 for _ in range(num_simulations):
     # Here we call the C++ function directly from Python
@@ -45,6 +46,83 @@ print(f"C++ version took: {cpp_duration:.4f} seconds")
 
 print("-" * 30)
 
+# --- Benchmark C++ Version (batched) ---
+print(f"Running {num_simulations:,} simulations in C++, one batched call...")
+start_time_batch = time.time()
+# A single call returns the whole (num_simulations, steps + 1) NumPy array
+paths_batch = mc_engine_cpp.generate_paths(S0, r, sigma, T, steps, num_simulations, 42)
+end_time_batch = time.time()
+batch_duration = end_time_batch - start_time_batch
+print(f"Batched C++ version took: {batch_duration:.4f} seconds")
+
+print("-" * 30)
+
 # --- Calculate and Display the Speedup ---
 speedup = python_duration / cpp_duration
-print(f"C++ version is {speedup:.2f}x faster than the Python version.")
\ No newline at end of file
+print(f"C++ version is {speedup:.2f}x faster than the Python version.")
+batch_speedup = python_duration / batch_duration
+print(f"Batched C++ version is {batch_speedup:.2f}x faster than the Python version "
+      f"({cpp_duration / batch_duration:.2f}x faster than one call per path).")
+
+print("-" * 30)
+
+# --- Thread Scaling of the Batched C++ Version ---
+# Paths are split across native threads with the GIL released; output is identical for any thread count.
+max_threads = os.cpu_count() or 1
+thread_counts = sorted({1, 2, 4, 8, 16, 32, max_threads} & set(range(1, max_threads + 1)))
+print(f"Thread scaling for {num_simulations:,} batched paths ({max_threads} cores available):")
+single_thread_duration = None
+for n_threads in thread_counts:
+    start_time_mt = time.time()
+    mc_engine_cpp.generate_paths(S0, r, sigma, T, steps, num_simulations, 42, n_threads)
+    mt_duration = time.time() - start_time_mt
+    if single_thread_duration is None:
+        single_thread_duration = mt_duration
+    print(f"{n_threads:>3} threads: {mt_duration:.4f} seconds ({single_thread_duration / mt_duration:.2f}x vs. 1 thread)")
+
+print("-" * 30)
+
+# --- Variance Reduction for the Asian Pricer ---
+from monte_carlo import price_asian_option_mc
+vr_paths = 20_000
+print(f"Asian call, {vr_paths:,} paths, by variance reduction technique:")
+for label, flags in [("plain", {}),
+                     ("antithetic", {"antithetic": True}),
+                     ("moment matching", {"moment_matching": True}),
+                     ("control variate", {"control_variate": True}),
+                     ("all three", {"antithetic": True, "control_variate": True, "moment_matching": True})]:
+    start_time_vr = time.time()
+    vr = price_asian_option_mc(S0, 100.0, T, r, sigma, vr_paths, steps, 'call', seed=42, n_sample_paths=0, **flags)
+    vr_duration = time.time() - start_time_vr
+    print(f"{label:>16}: price {vr['price']:.4f} +/- {vr['std_error']:.5f}, "
+          f"effective paths {vr['n_effective']:,.0f} ({vr['n_effective'] / vr_paths:.1f}x), {vr_duration:.3f} s")
+
+print("-" * 30)
+
+# --- Convergence: Pseudo-Random vs. Sobol QMC at Equal Wall Time ---
+# Reference price from a large QMC run with the control variate, then both samplers get the
+# same time budgets; path counts are sized from each sampler's measured cost per path.
+reference = price_asian_option_mc(S0, 100.0, T, r, sigma, 2 ** 20, steps, 'call', seed=0,
+                                  n_sample_paths=0, qmc=True, control_variate=True)['price']
+print(f"Asian call reference price (QMC + control variate, 2^20 paths): {reference:.5f}")
+
+def timed_run(n_paths, use_qmc, run_seed):
+    start = time.time()
+    result = price_asian_option_mc(S0, 100.0, T, r, sigma, n_paths, steps, 'call', seed=run_seed,
+                                   n_sample_paths=0, qmc=use_qmc)
+    return result, time.time() - start
+
+cost_per_path = {}
+for use_qmc in (False, True):
+    _, calibration_time = timed_run(2 ** 15, use_qmc, 1)
+    cost_per_path[use_qmc] = calibration_time / 2 ** 15
+
+print(f"{'budget':>8} | {'pseudo paths':>12} {'pseudo err':>11} {'pseudo s.e.':>11} | "
+      f"{'QMC paths':>10} {'QMC err':>10} {'QMC s.e.':>10}")
+for budget in (0.05, 0.1, 0.2, 0.5, 1.0, 2.0):
+    row = f"{budget:>7.2f}s |"
+    for use_qmc in (False, True):
+        n_paths = max(int(budget / cost_per_path[use_qmc]), 64)
+        result, _ = timed_run(n_paths, use_qmc, 2)
+        row += f" {n_paths:>12,} {abs(result['price'] - reference):>11.5f} {result['std_error']:>11.5f} |"
+    print(row.rstrip(" |"))
@@ -0,0 +1,41 @@
+import timeit
+import numpy as np
+
+from bsm_model import black_scholes_merton, black_scholes_merton_fast, black_scholes_merton_vec
+
+# --- Contract Parameters ---
+S = 100.0
+EX = 105.0
+T = 0.5
+r = 0.05
+sigma = 0.2
+n_calls = 20_000
+
+# --- Check the kernels agree ---
+reference = np.array(black_scholes_merton(S, EX, T, r, sigma, 'put'))
+fast = np.array(black_scholes_merton_fast(S, EX, T, r, sigma, 'put'))
+print(f"Max abs difference vs. black_scholes_merton: {np.abs(reference - fast).max():.2e}")
+
+print("-" * 30)
+
+# --- Per-call latency ---
+def per_call_us(stmt):
+    # best of 5 repeats, in microseconds per call
+    return min(timeit.repeat(stmt, number=n_calls, repeat=5)) / n_calls * 1e6
+
+scipy_us = per_call_us(lambda: black_scholes_merton(S, EX, T, r, sigma, 'call'))
+fast_us = per_call_us(lambda: black_scholes_merton_fast(S, EX, T, r, sigma, 'call'))
+price_only_us = per_call_us(lambda: black_scholes_merton_fast(S, EX, T, r, sigma, 'call', greeks=False))
+
+print(f"black_scholes_merton (scipy.stats):      {scipy_us:8.2f} us/call")
+print(f"black_scholes_merton_fast (greeks):      {fast_us:8.2f} us/call ({scipy_us / fast_us:.1f}x)")
+print(f"black_scholes_merton_fast (price only):  {price_only_us:8.2f} us/call ({scipy_us / price_only_us:.1f}x)")
+
+print("-" * 30)
+
+# --- Whole chain in one vectorized call ---
+strikes = np.linspace(50, 150, 10_000)
+is_call = np.arange(strikes.size) % 2 == 0
+chain_s = min(timeit.repeat(lambda: black_scholes_merton_vec(S, strikes, T, r, sigma, is_call), number=20, repeat=5)) / 20
+print(f"black_scholes_merton_vec, {strikes.size:,} strikes: {chain_s * 1e3:.3f} ms "
+      f"({chain_s / strikes.size * 1e6:.3f} us/contract)")
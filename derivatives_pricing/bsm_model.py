@@ -2,8 +2,10 @@
 #  This module implements the Black-Scholes-Merton model for option pricing.
 #  It includes functions to calculate the price of European call and put options.
 
+import math
 import numpy as np
 import scipy.stats as si
+from scipy.special import ndtr
 
 def black_scholes_merton(S, EX, T, r, sigma, option_type='call'):
     """
@@ -67,4 +69,108 @@ def black_scholes_merton(S, EX, T, r, sigma, option_type='call'):
     rho = EX * T * np.exp(-r * T) * N_d2 if option_type.lower() == 'call' else -EX * T * np.exp(-r * T) * (1 - N_d2)
 
     # Return the option price and Greeks
-    return option_price, delta, gamma, vega, theta, rho
\ No newline at end of file
+    return option_price, delta, gamma, vega, theta, rho
+
+def black_scholes_merton_vec(S, EX, T, r, sigma, is_call=True):
+    """
+    Vectorized Black-Scholes-Merton price and Greeks for whole option chains.
+
+    Parameters:
+    S, EX, T, r, sigma : float or array-like, broadcastable against each other
+        (same meaning as in black_scholes_merton)
+    is_call : bool or array-like of bool/int, True (or 1) for calls, False (or 0) for puts
+
+    Returns:
+    tuple of arrays (price, delta, gamma, vega, theta, rho), each with the broadcast shape
+    of the inputs. Terms shared by the price and the Greeks are computed once.
+    """
+    S, EX, T, r, sigma = (np.asarray(x, dtype=float) for x in (S, EX, T, r, sigma))
+    is_call = np.asarray(is_call).astype(bool)
+
+    # shared terms
+    sqrt_T = np.sqrt(T)
+    vol_sqrt_T = sigma * sqrt_T
+    discounted_EX = EX * np.exp(-r * T)
+
+    d1 = (np.log(S / EX) + (r + 0.5 * sigma ** 2) * T) / vol_sqrt_T
+    d2 = d1 - vol_sqrt_T
+
+    N_d1 = ndtr(d1)
+    N_d2 = ndtr(d2)
+    pdf_d1 = np.exp(-0.5 * d1 ** 2) / np.sqrt(2 * np.pi)
+
+    # calls use N(d), puts use N(d) - 1 = -N(-d)
+    call_put_shift = np.where(is_call, 0.0, 1.0)
+    N_d1_cp = N_d1 - call_put_shift
+    N_d2_cp = N_d2 - call_put_shift
+
+    option_price = S * N_d1_cp - discounted_EX * N_d2_cp
+    delta = N_d1_cp
+    gamma = pdf_d1 / (S * vol_sqrt_T)
+    vega = S * pdf_d1 * sqrt_T
+    theta = -S * pdf_d1 * sigma / (2 * sqrt_T) - r * discounted_EX * N_d2_cp
+    rho = T * discounted_EX * N_d2_cp
+
+    return option_price, delta, gamma, vega, theta, rho
+
+
+_SQRT_2 = math.sqrt(2.0)
+_SQRT_2_PI = math.sqrt(2.0 * math.pi)
+
+
+def _norm_cdf(x):
+    """Standard normal CDF via math.erfc (accurate in both tails)."""
+    return 0.5 * math.erfc(-x / _SQRT_2)
+
+
+def _norm_pdf(x):
+    """Standard normal density."""
+    return math.exp(-0.5 * x * x) / _SQRT_2_PI
+
+
+def black_scholes_merton_fast(S, EX, T, r, sigma, option_type='call', greeks=True):
+    """
+    Lean scalar Black-Scholes-Merton kernel for hot loops such as implied-volatility root finding.
+
+    Same inputs and outputs as black_scholes_merton, but for plain Python floats only: the
+    normal CDF/PDF come from math.erfc/math.exp instead of scipy.stats.norm, which avoids
+    the per-call distribution dispatch.
+
+    Parameters:
+    greeks : bool, if False only the option price is computed and returned (as a float)
+
+    Returns:
+    float price if greeks is False, otherwise (price, delta, gamma, vega, theta, rho)
+    """
+    is_call = option_type.lower() == 'call'
+    if not is_call and option_type.lower() != 'put':
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+
+    sqrt_T = math.sqrt(T)
+    vol_sqrt_T = sigma * sqrt_T
+    discounted_EX = EX * math.exp(-r * T)
+
+    d1 = (math.log(S / EX) + (r + 0.5 * sigma * sigma) * T) / vol_sqrt_T
+    d2 = d1 - vol_sqrt_T
+
+    if is_call:
+        N_d1 = _norm_cdf(d1)
+        N_d2 = _norm_cdf(d2)
+        option_price = S * N_d1 - discounted_EX * N_d2
+    else:
+        # N(d) - 1 = -N(-d), evaluated directly to keep precision deep in the money
+        N_d1 = -_norm_cdf(-d1)
+        N_d2 = -_norm_cdf(-d2)
+        option_price = S * N_d1 - discounted_EX * N_d2
+
+    if not greeks:
+        return option_price
+
+    pdf_d1 = _norm_pdf(d1)
+    delta = N_d1
+    gamma = pdf_d1 / (S * vol_sqrt_T)
+    vega = S * pdf_d1 * sqrt_T
+    theta = -S * pdf_d1 * sigma / (2 * sqrt_T) - r * discounted_EX * N_d2
+    rho = T * discounted_EX * N_d2
+
+    return option_price, delta, gamma, vega, theta, rho
@@ -1,45 +1,530 @@
 #include <vector>
+#include <atomic>
+#include <cstdint>
 #include <iostream>
 #include <cmath>
 #include <random>
+#include <stdexcept>
+#include <thread>
+#include <algorithm>
 #include <pybind11/pybind11.h>
+#include <pybind11/numpy.h> // py::array_t, exposes C++ buffers to NumPy without copying
 #include <pybind11/stl.h> // Needed to automatically convert std::vector <-> Python list
 
 namespace py = pybind11;
 
-// core finction
-std::vector<double> generate_single_path(double S0, double r, double sigma, double T, int steps){
+// Paths are handed to worker threads in fixed-size chunks pulled from a shared counter.
+// Every path's numbers depend only on its index, so results do not depend on n_threads.
+const int PATH_CHUNK = 1024;
 
-    // time step
-    double dt = T / steps;
+// n_threads <= 0 means one thread per hardware core
+int resolve_threads(int n_threads) {
+    if (n_threads > 0) return n_threads;
+    unsigned int hw = std::thread::hardware_concurrency();
+    return hw == 0 ? 1 : (int)hw;
+}
+
+// Calls work(begin, end) over [0, n_items) in chunks of PATH_CHUNK on up to n_threads threads.
+// Must be called with the GIL released: the workers never touch Python objects.
+template <typename Work>
+void parallel_chunks(long long n_items, int n_threads, Work work) {
+    long long n_chunks = (n_items + PATH_CHUNK - 1) / PATH_CHUNK;
+    int n_workers = (int)std::min<long long>(resolve_threads(n_threads), n_chunks);
+    std::atomic<long long> next_chunk(0);
+
+    auto worker = [&]() {
+        for (long long c = next_chunk++; c < n_chunks; c = next_chunk++) {
+            long long begin = c * PATH_CHUNK;
+            work(begin, std::min(begin + PATH_CHUNK, n_items));
+        }
+    };
+
+    if (n_workers <= 1) {
+        worker();
+        return;
+    }
+    std::vector<std::thread> pool;
+    for (int t = 0; t < n_workers; ++t) pool.emplace_back(worker);
+    for (std::thread& th : pool) th.join();
+}
+
+// Philox4x32-10 counter-based generator (Salmon et al., "Parallel Random Numbers: As Easy as 1, 2, 3")
+// Output is a pure function of (counter, key): no state to set up per path, any block can be
+// computed directly (skip-ahead for free), and streams never overlap.
+struct Philox4x32 {
+    static void round(uint32_t ctr[4], const uint32_t key[2]) {
+        uint64_t p0 = (uint64_t)0xD2511F53u * ctr[0];
+        uint64_t p1 = (uint64_t)0xCD9E8D57u * ctr[2];
+        uint32_t hi0 = (uint32_t)(p0 >> 32), lo0 = (uint32_t)p0;
+        uint32_t hi1 = (uint32_t)(p1 >> 32), lo1 = (uint32_t)p1;
+        uint32_t c0 = hi1 ^ ctr[1] ^ key[0];
+        uint32_t c2 = hi0 ^ ctr[3] ^ key[1];
+        ctr[0] = c0; ctr[1] = lo1; ctr[2] = c2; ctr[3] = lo0;
+    }
+
+    static void block(uint32_t ctr[4], uint32_t key0, uint32_t key1) {
+        uint32_t key[2] = {key0, key1};
+        for (int i = 0; i < 10; ++i) {
+            if (i > 0) { key[0] += 0x9E3779B9u; key[1] += 0xBB67AE85u; }
+            round(ctr, key);
+        }
+    }
+};
+
+// Independent normal stream for one path: the key is the engine seed, the counter is
+// (path index, block index). Each Philox block yields two normals via Box-Muller.
+class PathStream {
+public:
+    PathStream(uint64_t seed, uint64_t path_index, uint64_t offset = 0)
+        : seed_(seed), path_(path_index), block_(offset / 2), has_spare_(false) {
+        if (offset % 2) next_normal(); // land on an odd offset inside a block
+    }
+
+    double next_normal() {
+        if (has_spare_) { has_spare_ = false; return spare_; }
+        uint32_t ctr[4] = {(uint32_t)path_, (uint32_t)(path_ >> 32), (uint32_t)block_, (uint32_t)(block_ >> 32)};
+        Philox4x32::block(ctr, (uint32_t)seed_, (uint32_t)(seed_ >> 32));
+        ++block_;
+        // two 53-bit uniforms in (0, 1)
+        double u1 = ((((uint64_t)ctr[0] << 32 | ctr[1]) >> 11) + 0.5) * (1.0 / 9007199254740992.0); // 2^-53
+        double u2 = ((((uint64_t)ctr[2] << 32 | ctr[3]) >> 11) + 0.5) * (1.0 / 9007199254740992.0); // 2^-53
+        double radius = sqrt(-2.0 * log(u1));
+        double angle = 6.283185307179586 * u2; // 2 * pi
+        spare_ = radius * sin(angle);
+        has_spare_ = true;
+        return radius * cos(angle);
+    }
+
+private:
+    uint64_t seed_;
+    uint64_t path_;
+    uint64_t block_;
+    bool has_spare_;
+    double spare_;
+};
+
+// Engine seeded once; path p always draws the same normals for the same seed, whatever
+// batch it is generated in or how the batch is split up.
+class MCEngine {
+public:
+    explicit MCEngine(long long seed)
+        : seed_(seed < 0 ? ((uint64_t)std::random_device{}() << 32 | std::random_device{}()) : (uint64_t)seed),
+          next_path_(0) {}
+
+    uint64_t seed() const { return seed_; }
+
+    PathStream stream(uint64_t path_index, uint64_t offset = 0) const {
+        return PathStream(seed_, path_index, offset);
+    }
+
+    // Fills `row` (steps + 1 prices) with GBM path number `path_index`
+    void fill_path(double* row, uint64_t path_index, double S0, double drift, double vol, int steps) const {
+        PathStream z = stream(path_index);
+        row[0] = S0;
+        for (int i = 1; i <= steps; ++i) {
+            row[i] = row[i - 1] * exp(drift + vol * z.next_normal());
+        }
+    }
+
+    // batched path generation
+    // Fills one contiguous (n_paths, steps + 1) NumPy array in place, so Python pays a single
+    // call and no per-path list conversion. Rows are paths first_path .. first_path + n_paths - 1,
+    // split across n_threads native threads with the GIL released.
+    py::array_t<double> generate_paths(double S0, double r, double sigma, double T, int steps, int n_paths,
+                                       unsigned long long first_path, int n_threads) const {
+        if (steps <= 0 || n_paths <= 0) {
+            throw std::invalid_argument("steps and n_paths must be positive");
+        }
+
+        // allocate the output matrix once; NumPy owns the memory, we write into it directly
+        py::array_t<double> paths({(py::ssize_t)n_paths, (py::ssize_t)steps + 1});
+        double* out = paths.mutable_data();
+
+        // GBM terms that do not change between steps
+        double dt = T / steps;
+        double drift = (r - 0.5 * sigma * sigma) * dt;
+        double vol = sigma * sqrt(dt);
+
+        // other Python threads (e.g. the Streamlit server) keep running while we simulate
+        py::gil_scoped_release release;
+        parallel_chunks(n_paths, n_threads, [&](long long begin, long long end) {
+            for (long long p = begin; p < end; ++p) {
+                fill_path(out + (size_t)p * (steps + 1), first_path + p, S0, drift, vol, steps);
+            }
+        });
+
+        return paths;
+    }
+
+    // fused Asian pricing
+    // Simulates n_paths paths but keeps only a running arithmetic (or geometric) average of
+    // S_1 .. S_steps per path, turning each path into one payoff on the fly. Memory is two
+    // doubles per path plus the first n_sample_paths full paths kept for plotting.
+    //
+    // Variance reduction, each optional:
+    //   antithetic      - paths 2k and 2k + 1 use normals Z and -Z; pairs are the iid samples
+    //   moment_matching - the samples are split into `replications` contiguous batches, and
+    //                     within each batch the normals are shifted and scaled per time step to
+    //                     sample mean 0 and variance 1 (two passes; the counter-based streams
+    //                     are simply regenerated, nothing is stored). Matching ties the paths of
+    //                     a batch together, so the standard error comes from the spread of the
+    //                     independent batch estimates rather than from the paths
+    //   control_price   - discounted closed-form price of the geometric-average Asian option;
+    //                     when finite, the geometric payoff of each path is used as a control
+    //                     variate with the optimal (sample) coefficient
+    py::dict price_asian(double S0, double K, double r, double sigma, double T, int steps, int n_paths,
+                         bool is_call, bool geometric, int n_sample_paths, int n_threads,
+                         bool antithetic, bool moment_matching, double control_price, int replications) const {
+        if (steps <= 0 || n_paths <= 0) {
+            throw std::invalid_argument("steps and n_paths must be positive");
+        }
+        if (antithetic && n_paths % 2) ++n_paths; // keep every path paired
+        long long n_samples = antithetic ? n_paths / 2 : n_paths;
+        if (moment_matching && (replications < 2 || replications > n_samples)) {
+            throw std::invalid_argument("moment matching needs 2 <= replications <= number of independent samples");
+        }
+        int n_batches = moment_matching ? replications : 1;
+        n_sample_paths = std::max(0, std::min(n_sample_paths, n_paths));
+        bool control_variate = std::isfinite(control_price);
+
+        std::vector<double> payoffs(n_paths), control_payoffs(n_paths);
+        py::array_t<double> samples({(py::ssize_t)n_sample_paths, (py::ssize_t)steps + 1});
+        double* sample_out = samples.mutable_data();
+
+        double dt = T / steps;
+        double drift = (r - 0.5 * sigma * sigma) * dt;
+        double vol = sigma * sqrt(dt);
+        double log_S0 = log(S0);
+        double discount = exp(-r * T);
+
+        // per-batch, per-step shift and scale applied to the normals (identity unless moment matching)
+        std::vector<double> z_shift((size_t)n_batches * steps, 0.0), z_scale((size_t)n_batches * steps, 1.0);
+
+        // normal number i of path p
+        auto path_stream = [&](long long p) { return stream(antithetic ? p / 2 : p); };
+        double sign_of[2] = {1.0, antithetic ? -1.0 : 1.0};
+        // batch b holds samples [batch_start(b), batch_start(b + 1)); an antithetic pair is one sample
+        auto batch_start = [&](long long b) { return b * n_samples / n_batches; };
+        auto batch_of = [&](long long s) { return (int)(((s + 1) * n_batches - 1) / n_samples); };
+        int paths_per_sample = antithetic ? 2 : 1;
+
+        double price = 0.0, std_error = 0.0, plain_variance = 0.0;
+
+        {
+            py::gil_scoped_release release;
+
+            for (int b = 0; moment_matching && b < n_batches; ++b) {
+                // pass 1, per batch: per-step sums of Z and Z^2, one slot per chunk so the total
+                // is summed in the same order whatever the thread count
+                long long first = batch_start(b) * paths_per_sample;
+                long long n_batch_paths = batch_start(b + 1) * paths_per_sample - first;
+                long long n_chunks = (n_batch_paths + PATH_CHUNK - 1) / PATH_CHUNK;
+                std::vector<double> chunk_sums((size_t)n_chunks * steps * 2, 0.0);
+                parallel_chunks(n_batch_paths, n_threads, [&](long long begin, long long end) {
+                    double* sums = chunk_sums.data() + (size_t)(begin / PATH_CHUNK) * steps * 2;
+                    for (long long p = first + begin; p < first + end; ++p) {
+                        PathStream z = path_stream(p);
+                        for (int i = 0; i < steps; ++i) {
+                            double zi = sign_of[p % 2] * z.next_normal();
+                            sums[2 * i] += zi;
+                            sums[2 * i + 1] += zi * zi;
+                        }
+                    }
+                });
+                for (int i = 0; i < steps; ++i) {
+                    double sum = 0.0, sum_sq = 0.0;
+                    for (long long c = 0; c < n_chunks; ++c) {
+                        sum += chunk_sums[((size_t)c * steps + i) * 2];
+                        sum_sq += chunk_sums[((size_t)c * steps + i) * 2 + 1];
+                    }
+                    double mean = sum / n_batch_paths;
+                    double var = sum_sq / n_batch_paths - mean * mean;
+                    z_shift[(size_t)b * steps + i] = mean;
+                    z_scale[(size_t)b * steps + i] = var > 0.0 ? 1.0 / sqrt(var) : 1.0;
+                }
+            }
+
+            parallel_chunks(n_paths, n_threads, [&](long long begin, long long end) {
+                for (long long p = begin; p < end; ++p) {
+                    PathStream z = path_stream(p);
+                    double sign = sign_of[p % 2];
+                    const double* shift = z_shift.data() + (size_t)batch_of(p / paths_per_sample) * steps;
+                    const double* scale = z_scale.data() + (size_t)batch_of(p / paths_per_sample) * steps;
+                    double* row = p < n_sample_paths ? sample_out + (size_t)p * (steps + 1) : nullptr;
+                    if (row) row[0] = S0;
+
+                    // work in log space: the geometric average comes from the sum of log prices
+                    double log_S = log_S0, sum_S = 0.0, sum_log_S = 0.0;
+                    for (int i = 1; i <= steps; ++i) {
+                        double zi = (sign * z.next_normal() - shift[i - 1]) * scale[i - 1];
+                        log_S += drift + vol * zi;
+                        sum_log_S += log_S;
+                        if (!geometric || row) {
+                            double S = exp(log_S);
+                            sum_S += S;
+                            if (row) row[i] = S;
+                        }
+                    }
+
+                    double geometric_average = exp(sum_log_S / steps);
+                    double average_price = geometric ? geometric_average : sum_S / steps;
+                    payoffs[p] = is_call ? std::max(average_price - K, 0.0) : std::max(K - average_price, 0.0);
+                    control_payoffs[p] = is_call ? std::max(geometric_average - K, 0.0) : std::max(K - geometric_average, 0.0);
+                }
+            });
+
+            // reduce in path order so the result does not depend on n_threads
+            // x: payoff sample, y: control sample (antithetic pairs averaged into one sample)
+            auto x_of = [&](long long s) { return antithetic ? 0.5 * (payoffs[2 * s] + payoffs[2 * s + 1]) : payoffs[s]; };
+            auto y_of = [&](long long s) {
+                return antithetic ? 0.5 * (control_payoffs[2 * s] + control_payoffs[2 * s + 1]) : control_payoffs[s];
+            };
 
-    // vector store
-    std::vector<double> path;
-    path.push_back(S0);
-    
-    // random number generator for standard normal distribution
-    std::random_device rd;
-    std::mt19937 gen(rd());
-    std::normal_distribution<> d(0.0,1.0); // produces random numbers with mean = 0 and standard deviation 1
+            double mean_x = 0.0, mean_y = 0.0, mean_path = 0.0;
+            for (long long s = 0; s < n_samples; ++s) { mean_x += x_of(s); mean_y += y_of(s); }
+            mean_x /= n_samples;
+            mean_y /= n_samples;
+            for (long long p = 0; p < n_paths; ++p) mean_path += payoffs[p];
+            mean_path /= n_paths;
 
-    // The main simulation loop
-    for (int i = 1; i <= steps; ++i) {
-        // Generate a random number Z from the standard normal distribution
-        double Z = d(gen);
+            double var_x = 0.0, var_y = 0.0, cov_xy = 0.0;
+            for (long long s = 0; s < n_samples; ++s) {
+                double dx = x_of(s) - mean_x, dy = y_of(s) - mean_y;
+                var_x += dx * dx;
+                var_y += dy * dy;
+                cov_xy += dx * dy;
+            }
+            for (long long p = 0; p < n_paths; ++p) plain_variance += (payoffs[p] - mean_path) * (payoffs[p] - mean_path);
+            double dof = n_samples > 1 ? (double)(n_samples - 1) : 1.0;
+            var_x /= dof;
+            var_y /= dof;
+            cov_xy /= dof;
+            plain_variance /= n_paths > 1 ? (double)(n_paths - 1) : 1.0;
 
-        // Get the previous price from the path
-        double St_minus_1 = path.back();
+            double estimate = mean_x, estimate_variance = var_x;
+            double b = control_variate && var_y > 0.0 ? cov_xy / var_y : 0.0;
+            if (b != 0.0) {
+                estimate = mean_x - b * (mean_y - control_price / discount);
+                estimate_variance = std::max(var_x - b * cov_xy, 0.0);
+            }
+            price = discount * estimate;
+            std_error = discount * sqrt(estimate_variance / n_samples);
 
-        // Apply the GBM formula to get the next price
-        double St = St_minus_1 * exp((r - 0.5 * sigma * sigma) * dt + sigma * sqrt(dt) * Z);
+            if (moment_matching) {
+                // one estimate per independently matched batch (control coefficient pooled over
+                // all samples); the price is their mean and its standard error their spread
+                std::vector<double> estimates(n_batches);
+                double sum = 0.0;
+                for (int k = 0; k < n_batches; ++k) {
+                    double batch_x = 0.0, batch_y = 0.0;
+                    for (long long s = batch_start(k); s < batch_start(k + 1); ++s) { batch_x += x_of(s); batch_y += y_of(s); }
+                    long long n_batch = batch_start(k + 1) - batch_start(k);
+                    estimates[k] = batch_x / n_batch;
+                    if (b != 0.0) estimates[k] -= b * (batch_y / n_batch - control_price / discount);
+                    sum += estimates[k];
+                }
+                double mean_estimate = sum / n_batches, spread = 0.0;
+                for (double e : estimates) spread += (e - mean_estimate) * (e - mean_estimate);
+                price = discount * mean_estimate;
+                std_error = discount * sqrt(spread / (n_batches - 1) / n_batches);
+            }
+        }
 
-        // Add the new price to our path
-        path.push_back(St);
+        // effective sample count: plain paths needed to reach the same standard error
+        double effective = std_error > 0.0 ? discount * discount * plain_variance / (std_error * std_error) : (double)n_paths;
+
+        py::dict result;
+        result["price"] = price;
+        result["std_error"] = std_error;
+        result["n_paths"] = n_paths;
+        result["n_effective"] = effective;
+        result["sample_paths"] = samples;
+        return result;
+    }
+
+    // Standard normals number offset .. offset + n - 1 of a path's stream
+    py::array_t<double> normals(unsigned long long path_index, int n, unsigned long long offset) const {
+        py::array_t<double> out(n);
+        double* z = out.mutable_data();
+        PathStream s = stream(path_index, offset);
+        for (int i = 0; i < n; ++i) z[i] = s.next_normal();
+        return out;
     }
 
+    // hands out consecutive path indices to callers that draw one path at a time
+    uint64_t take_path_index() { return next_path_++; }
+
+private:
+    uint64_t seed_;
+    std::atomic<uint64_t> next_path_;
+};
+
+// Inverse of the standard normal CDF: Acklam's rational approximation refined by one
+// Halley step, accurate to double precision on (0, 1)
+double inverse_normal_cdf(double u) {
+    static const double a[] = {-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+                               1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00};
+    static const double b[] = {-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+                               6.680131188771972e+01, -1.328068155288572e+01};
+    static const double c[] = {-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+                               -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00};
+    static const double d[] = {7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+                               3.754408661907416e+00};
+    const double u_low = 0.02425, u_high = 1.0 - u_low;
+
+    double x;
+    if (u < u_low) {
+        double q = sqrt(-2.0 * log(u));
+        x = (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) /
+            ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1.0);
+    } else if (u <= u_high) {
+        double q = u - 0.5, t = q * q;
+        x = (((((a[0] * t + a[1]) * t + a[2]) * t + a[3]) * t + a[4]) * t + a[5]) * q /
+            (((((b[0] * t + b[1]) * t + b[2]) * t + b[3]) * t + b[4]) * t + 1.0);
+    } else {
+        double q = sqrt(-2.0 * log(1.0 - u));
+        x = -(((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) /
+             ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1.0);
+    }
+
+    // Halley refinement against the exact CDF (upper tail written via 1 - u to avoid cancellation)
+    double e = u <= 0.5 ? 0.5 * erfc(-x / sqrt(2.0)) - u : (1.0 - u) - 0.5 * erfc(x / sqrt(2.0));
+    double g = e * 2.5066282746310002 * exp(0.5 * x * x); // sqrt(2 * pi)
+    return x - g / (1.0 + 0.5 * x * g);
+}
+
+// Brownian bridge over steps 1 .. n (unit spacing). Normal k of a point fills W at index
+// target[k] from the already known W[left[k]] and W[right[k]]: the first normal sets the
+// endpoint W[n], the next ones bisect the widest gaps. Low-discrepancy points put their
+// best-distributed coordinates first, so they land on the moves that drive the payoff.
+struct BrownianBridge {
+    std::vector<int> target, left, right;
+    std::vector<double> left_weight, right_weight, std_dev;
+
+    explicit BrownianBridge(int n) {
+        target.push_back(n); left.push_back(0); right.push_back(0);
+        left_weight.push_back(0.0); right_weight.push_back(0.0); std_dev.push_back(sqrt((double)n));
+
+        // breadth-first bisection of [0, n]
+        std::vector<std::pair<int, int>> gaps(1, std::make_pair(0, n));
+        for (size_t g = 0; g < gaps.size(); ++g) {
+            int l = gaps[g].first, r = gaps[g].second;
+            if (r - l < 2) continue;
+            int m = (l + r) / 2;
+            target.push_back(m); left.push_back(l); right.push_back(r);
+            left_weight.push_back((double)(r - m) / (r - l));
+            right_weight.push_back((double)(m - l) / (r - l));
+            std_dev.push_back(sqrt((double)(m - l) * (r - m) / (r - l)));
+            gaps.push_back(std::make_pair(l, m));
+            gaps.push_back(std::make_pair(m, r));
+        }
+    }
+
+    // z: n standard normals in bridge order; w: n + 1 slots, w[0] = 0 on return
+    void build(const double* z, double* w) const {
+        w[0] = 0.0;
+        for (size_t k = 0; k < target.size(); ++k) {
+            w[target[k]] = left_weight[k] * w[left[k]] + right_weight[k] * w[right[k]] + std_dev[k] * z[k];
+        }
+    }
+};
+
+// quasi-Monte Carlo Asian payoffs
+// Each row of `uniforms` is one point of a (scrambled) low-discrepancy sequence in
+// [0, 1)^steps. Rows are mapped to normals, assembled into a Brownian motion by the bridge
+// and turned into GBM paths; only the payoff (and the geometric-average control payoff)
+// of each row is kept, plus the first n_sample_paths paths for plotting.
+py::dict price_asian_qmc(py::array_t<double, py::array::c_style | py::array::forcecast> uniforms, double S0,
+                         double K, double r, double sigma, double T, bool is_call, bool geometric,
+                         int n_sample_paths, int n_threads) {
+    if (uniforms.ndim() != 2 || uniforms.shape(1) <= 0) {
+        throw std::invalid_argument("uniforms must be a 2-D (n_points, steps) array");
+    }
+    long long n_points = uniforms.shape(0);
+    int steps = (int)uniforms.shape(1);
+    n_sample_paths = (int)std::max(0LL, std::min((long long)n_sample_paths, n_points));
+
+    const double* u = uniforms.data();
+    py::array_t<double> payoffs(n_points), control_payoffs(n_points);
+    py::array_t<double> samples({(py::ssize_t)n_sample_paths, (py::ssize_t)steps + 1});
+    double* payoff_out = payoffs.mutable_data();
+    double* control_out = control_payoffs.mutable_data();
+    double* sample_out = samples.mutable_data();
+
+    BrownianBridge bridge(steps);
+    double dt = T / steps;
+    double drift = (r - 0.5 * sigma * sigma) * dt;
+    double vol = sigma * sqrt(dt);
+    double log_S0 = log(S0);
+
+    {
+        py::gil_scoped_release release;
+        parallel_chunks(n_points, n_threads, [&](long long begin, long long end) {
+            std::vector<double> z(steps), w(steps + 1);
+            for (long long p = begin; p < end; ++p) {
+                const double* point = u + (size_t)p * steps;
+                for (int i = 0; i < steps; ++i) {
+                    // keep the transform finite at the (measure-zero) edges of [0, 1)
+                    z[i] = inverse_normal_cdf(std::min(std::max(point[i], 1e-16), 1.0 - 1e-16));
+                }
+                bridge.build(z.data(), w.data());
+
+                double* row = p < n_sample_paths ? sample_out + (size_t)p * (steps + 1) : nullptr;
+                if (row) row[0] = S0;
+                double log_S = log_S0, sum_S = 0.0, sum_log_S = 0.0;
+                for (int i = 1; i <= steps; ++i) {
+                    log_S += drift + vol * (w[i] - w[i - 1]);
+                    sum_log_S += log_S;
+                    if (!geometric || row) {
+                        double S = exp(log_S);
+                        sum_S += S;
+                        if (row) row[i] = S;
+                    }
+                }
+
+                double geometric_average = exp(sum_log_S / steps);
+                double average_price = geometric ? geometric_average : sum_S / steps;
+                payoff_out[p] = is_call ? std::max(average_price - K, 0.0) : std::max(K - average_price, 0.0);
+                control_out[p] = is_call ? std::max(geometric_average - K, 0.0) : std::max(K - geometric_average, 0.0);
+            }
+        });
+    }
+
+    py::dict result;
+    result["payoffs"] = payoffs;
+    result["control_payoffs"] = control_payoffs;
+    result["sample_paths"] = samples;
+    return result;
+}
+
+// engine behind generate_single_path, seeded once per process
+MCEngine& default_engine() {
+    static MCEngine engine(-1);
+    return engine;
+}
+
+// core finction
+// Draws the next path from the process-wide engine, so there is no generator to seed per call
+std::vector<double> generate_single_path(double S0, double r, double sigma, double T, int steps) {
+    double dt = T / steps;
+    std::vector<double> path(steps + 1);
+    MCEngine& engine = default_engine();
+    engine.fill_path(path.data(), engine.take_path_index(), S0, (r - 0.5 * sigma * sigma) * dt, sigma * sqrt(dt), steps);
     return path;
 }
 
+py::array_t<double> generate_paths(double S0, double r, double sigma, double T, int steps, int n_paths, long long seed,
+                                   int n_threads) {
+    return MCEngine(seed).generate_paths(S0, r, sigma, T, steps, n_paths, 0, n_threads);
+}
+
+py::dict price_asian(double S0, double K, double r, double sigma, double T, int steps, int n_paths, bool is_call,
+                     bool geometric, int n_sample_paths, long long seed, int n_threads, bool antithetic,
+                     bool moment_matching, double control_price, int replications) {
+    return MCEngine(seed).price_asian(S0, K, r, sigma, T, steps, n_paths, is_call, geometric, n_sample_paths, n_threads,
+                                      antithetic, moment_matching, control_price, replications);
+}
+
 // pybind 11 wrapper
 
 PYBIND11_MODULE(mc_engine_cpp, m) {
@@ -47,4 +532,34 @@ PYBIND11_MODULE(mc_engine_cpp, m) {
 
     m.def("generate_single_path", &generate_single_path, "A function that generates a single stock price path using GBM",
           py::arg("S0"), py::arg("r"), py::arg("sigma"), py::arg("T"), py::arg("steps"));
-}
\ No newline at end of file
+
+    m.def("generate_paths", &generate_paths, "Generates a (n_paths, steps + 1) NumPy array of GBM price paths in one call",
+          py::arg("S0"), py::arg("r"), py::arg("sigma"), py::arg("T"), py::arg("steps"), py::arg("n_paths"),
+          py::arg("seed") = -1, py::arg("n_threads") = 0);
+
+    m.def("price_asian", &price_asian, "Prices an Asian option without materializing paths; returns price, std_error, n_paths, n_effective and sample_paths",
+          py::arg("S0"), py::arg("K"), py::arg("r"), py::arg("sigma"), py::arg("T"), py::arg("steps"), py::arg("n_paths"),
+          py::arg("is_call") = true, py::arg("geometric") = false, py::arg("n_sample_paths") = 100,
+          py::arg("seed") = -1, py::arg("n_threads") = 0, py::arg("antithetic") = false,
+          py::arg("moment_matching") = false, py::arg("control_price") = NAN, py::arg("replications") = 8);
+
+    m.def("price_asian_qmc", &price_asian_qmc, "Asian payoffs for each row of a (n_points, steps) array of low-discrepancy points, via inverse-normal transform and Brownian bridge; returns payoffs, control_payoffs and sample_paths",
+          py::arg("uniforms"), py::arg("S0"), py::arg("K"), py::arg("r"), py::arg("sigma"), py::arg("T"),
+          py::arg("is_call") = true, py::arg("geometric") = false, py::arg("n_sample_paths") = 0, py::arg("n_threads") = 0);
+
+    m.def("inverse_normal_cdf", py::vectorize(inverse_normal_cdf), "Inverse of the standard normal CDF", py::arg("u"));
+
+    py::class_<MCEngine>(m, "MCEngine", "Monte Carlo engine seeded once, with one counter-based (Philox) normal stream per path index")
+        .def(py::init<long long>(), py::arg("seed") = -1)
+        .def_property_readonly("seed", &MCEngine::seed)
+        .def("generate_paths", &MCEngine::generate_paths, "Generates paths first_path .. first_path + n_paths - 1 as a (n_paths, steps + 1) array",
+             py::arg("S0"), py::arg("r"), py::arg("sigma"), py::arg("T"), py::arg("steps"), py::arg("n_paths"),
+             py::arg("first_path") = 0, py::arg("n_threads") = 0)
+        .def("price_asian", &MCEngine::price_asian, "Prices an Asian option without materializing paths; returns price, std_error, n_paths, n_effective and sample_paths",
+             py::arg("S0"), py::arg("K"), py::arg("r"), py::arg("sigma"), py::arg("T"), py::arg("steps"), py::arg("n_paths"),
+             py::arg("is_call") = true, py::arg("geometric") = false, py::arg("n_sample_paths") = 100,
+             py::arg("n_threads") = 0, py::arg("antithetic") = false, py::arg("moment_matching") = false,
+             py::arg("control_price") = NAN, py::arg("replications") = 8)
+        .def("normals", &MCEngine::normals, "Standard normals offset .. offset + n - 1 of one path's stream",
+             py::arg("path_index"), py::arg("n"), py::arg("offset") = 0);
+}
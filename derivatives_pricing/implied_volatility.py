@@ -1,6 +1,7 @@
 from scipy.optimize import brentq
+from scipy.special import ndtr
 import numpy as np
-from bsm_model import black_scholes_merton
+from bsm_model import black_scholes_merton_fast
 
 def implied_volatility(market_price, S, EX, T, r, option_type='call'):
     """
@@ -13,13 +14,18 @@ def implied_volatility(market_price, S, EX, T, r, option_type='call'):
     Returns:
         float: The implied volatility (as a decimal, e.g., 0.20 for 20%).
     """
+    # Quotes outside the no-arbitrage bounds have no implied volatility; skip the root search
+    valid, _ = no_arbitrage_check(market_price, S, EX, T, r, option_type.lower() == 'call')
+    if not valid:
+        return np.nan
+
     # Error Function
     def objective_function(sigma):
         """
         This function calculates the difference between the BSM price (for a given sigma) and the actual market price.
         The root-finder's goal is to make this function return 0.
         """
-        price, _, _, _, _, _= black_scholes_merton(S, EX, T, r, sigma, option_type)
+        price = black_scholes_merton_fast(S, EX, T, r, sigma, option_type, greeks=False)
         return price - market_price
     
     # Use brentq to find the root of the objective function
@@ -32,4 +38,185 @@ def implied_volatility(market_price, S, EX, T, r, option_type='call'):
         # we don't crash. We gracefully return NaN.
         implied_vol = np.nan
     
-    return implied_vol
\ No newline at end of file
+    return implied_vol
+
+# Search range for the vectorized solver, the same one brentq uses above
+IV_LOWER = 1e-6
+IV_UPPER = 5.0
+
+# Reasons a quote can be rejected before (or by) the root search, in the order they are checked;
+# 'no_convergence' marks contracts still unsolved after max_iter iterations
+REJECTION_REASONS = ('invalid_input', 'non_positive_price', 'below_intrinsic', 'above_upper_bound',
+                     'outside_search_range', 'no_convergence')
+
+
+def no_arbitrage_check(market_price, S, EX, T, r, is_call=True):
+    """
+    Vectorized no-arbitrage bounds check for option quotes, run before any root finding.
+
+    A European call must trade in (max(S - EX*e^(-rT), 0), S) and a put in
+    (max(EX*e^(-rT) - S, 0), EX*e^(-rT)); outside those bounds no volatility can
+    reproduce the quote. A price on the intrinsic bound implies zero volatility and is
+    rejected too.
+
+    Args:
+        market_price, S, EX, T, r: float or array-like, broadcastable against each other.
+        is_call: bool or array-like of bool/int, True (or 1) for calls, False (or 0) for puts.
+
+    Returns:
+        tuple: (valid, reasons) where valid is a boolean array with the broadcast shape of
+        the inputs, and reasons is an array of the same shape holding '' for valid quotes
+        and one of REJECTION_REASONS otherwise (the first failed check).
+    """
+    market_price, S, EX, T, r, is_call = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (market_price, S, EX, T, r)), np.asarray(is_call).astype(bool))
+
+    with np.errstate(invalid='ignore', over='ignore'):
+        discounted_EX = EX * np.exp(-r * T)
+        lower_bound = np.maximum(np.where(is_call, S - discounted_EX, discounted_EX - S), 0.0)
+        upper_bound = np.where(is_call, S, discounted_EX)
+
+        invalid_input = ~(np.isfinite(market_price) & np.isfinite(S) & np.isfinite(EX) & np.isfinite(T)
+                          & np.isfinite(r) & (S > 0) & (EX > 0) & (T > 0))
+        conditions = [invalid_input,
+                      market_price <= 0,
+                      market_price <= lower_bound,
+                      market_price >= upper_bound]
+
+    reasons = np.select(conditions, REJECTION_REASONS[:len(conditions)], default='').astype(object)
+    return reasons == '', reasons
+
+
+def count_rejections(reasons):
+    """Number of rejected quotes per reason, for every reason in REJECTION_REASONS."""
+    reasons = np.asarray(reasons)
+    return {reason: int(np.count_nonzero(reasons == reason)) for reason in REJECTION_REASONS}
+
+
+def _price_vega_vomma(sigma, S, EX, T, r, is_call):
+    """BSM price, vega and vomma (d vega / d sigma) for arrays of contracts."""
+    sqrt_T = np.sqrt(T)
+    vol_sqrt_T = sigma * sqrt_T
+    d1 = (np.log(S / EX) + (r + 0.5 * sigma ** 2) * T) / vol_sqrt_T
+    d2 = d1 - vol_sqrt_T
+    discounted_EX = EX * np.exp(-r * T)
+
+    price = np.where(is_call,
+                     S * ndtr(d1) - discounted_EX * ndtr(d2),
+                     discounted_EX * ndtr(-d2) - S * ndtr(-d1))
+    vega = S * np.exp(-0.5 * d1 ** 2) / np.sqrt(2 * np.pi) * sqrt_T
+    vomma = vega * d1 * d2 / sigma
+    return price, vega, vomma
+
+
+def _initial_guess(market_price, S, EX, T, r, is_call):
+    """
+    Starting volatility for the vectorized solver.
+
+    Two classic candidates are priced and the closer one is kept per contract:
+    the Corrado-Miller refinement of Brenner-Subrahmanyam (good near the money; puts
+    mapped to calls through put-call parity) and the Manaster-Koehler point where vega
+    peaks, from which Newton converges monotonically (good far from the money).
+    """
+    discounted_EX = EX * np.exp(-r * T)
+    call_price = np.where(is_call, market_price, market_price + S - discounted_EX)
+
+    half_gap = call_price - 0.5 * (S - discounted_EX)
+    radicand = half_gap ** 2 - (S - discounted_EX) ** 2 / np.pi
+    corrado_miller = np.sqrt(2 * np.pi / T) / (S + discounted_EX) * (half_gap + np.sqrt(np.maximum(radicand, 0.0)))
+    brenner_subrahmanyam = np.sqrt(2 * np.pi / T) * call_price / S
+    near_money = np.where(radicand >= 0, corrado_miller, brenner_subrahmanyam)
+
+    manaster_koehler = np.sqrt(2 * np.abs(np.log(S / EX) + r * T) / T)
+
+    candidates = [np.clip(np.where(np.isfinite(g), g, 0.2), IV_LOWER * 10, IV_UPPER * 0.9)
+                  for g in (near_money, manaster_koehler)]
+    errors = [np.abs(_price_vega_vomma(g, S, EX, T, r, is_call)[0] - market_price) for g in candidates]
+    return np.where(errors[0] <= errors[1], candidates[0], candidates[1])
+
+
+def implied_volatility_vec(market_price, S, EX, T, r, is_call=True, tol=1e-10, max_iter=50,
+                           return_rejections=False):
+    """
+    Vectorized implied volatility for whole option chains.
+
+    Every contract runs vega-based Halley steps from a Corrado-Miller/Brenner-Subrahmanyam
+    starting point. Each contract also keeps a [low, high] bracket that tightens on every
+    evaluation; a step that leaves the bracket (or meets a vanishing vega) is replaced by
+    bisection, so the solver cannot diverge. Converged contracts drop out of the working set.
+    Quotes outside the no-arbitrage bounds (see no_arbitrage_check) are rejected up front and
+    never reach the solver.
+
+    Args:
+        market_price, S, EX, T, r: float or array-like, broadcastable against each other.
+        is_call: bool or array-like of bool/int, True (or 1) for calls, False (or 0) for puts.
+        tol (float): Convergence tolerance, in volatility units.
+        max_iter (int): Maximum number of iterations.
+        return_rejections (bool): Also return the number of rejected quotes per reason.
+
+    Returns:
+        np.ndarray: Implied volatilities with the broadcast shape of the inputs; NaN where no
+        volatility in [IV_LOWER, IV_UPPER] reproduces the market price, or where the solver
+        did not converge within max_iter iterations.
+        If return_rejections is True, a tuple (iv, rejections) where rejections maps each
+        of REJECTION_REASONS to a count; every NaN volatility is counted under one reason.
+    """
+    market_price, S, EX, T, r, is_call = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (market_price, S, EX, T, r)), np.asarray(is_call).astype(bool))
+    shape = market_price.shape
+    market_price, S, EX, T, r, is_call = (x.ravel() for x in (market_price, S, EX, T, r, is_call))
+
+    iv = np.full(market_price.size, np.nan)
+
+    # cheap bounds check first: rejected quotes never reach the pricer
+    valid, reasons = no_arbitrage_check(market_price, S, EX, T, r, is_call)
+    candidates = np.flatnonzero(valid)
+
+    # a root in the search range exists only if the target price lies between the prices at
+    # the bracket ends (with a little slack for rounding in those prices)
+    cS, cEX, cT, cr, ccall, cprice = (x[candidates] for x in (S, EX, T, r, is_call, market_price))
+    price_low, _, _ = _price_vega_vomma(np.full(candidates.size, IV_LOWER), cS, cEX, cT, cr, ccall)
+    price_high, _, _ = _price_vega_vomma(np.full(candidates.size, IV_UPPER), cS, cEX, cT, cr, ccall)
+    slack = 1e-12 * np.maximum(cprice, 1.0)
+    in_range = (price_low - cprice <= slack) & (price_high - cprice >= -slack)
+    reasons[candidates[~in_range]] = 'outside_search_range'
+    active = candidates[in_range]
+
+    low = np.full(active.size, IV_LOWER)
+    high = np.full(active.size, IV_UPPER)
+
+    sigma = _initial_guess(market_price[active], S[active], EX[active], T[active], r[active], is_call[active])
+
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        price, vega, vomma = _price_vega_vomma(sigma, S[active], EX[active], T[active], r[active], is_call[active])
+        error = price - market_price[active]
+
+        # BSM price is increasing in sigma, so the sign of the error moves one end of the bracket
+        high = np.where(error > 0, sigma, high)
+        low = np.where(error <= 0, sigma, low)
+
+        # stop once the next step (error / vega) or the bracket is below tol in volatility terms
+        converged = (np.abs(error) <= tol * vega) | (high - low < tol)
+        iv[active[converged]] = sigma[converged]
+
+        # Halley step near the root (where its curvature correction is small), Newton step
+        # otherwise, and bisection wherever the step is unusable
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton_step = error / vega
+            halley_factor = 1 - 0.5 * newton_step * vomma / vega
+            step = np.where((halley_factor > 0.5) & (halley_factor < 2), newton_step / halley_factor, newton_step)
+        next_sigma = sigma - step
+        bad_step = ~np.isfinite(next_sigma) | (next_sigma <= low) | (next_sigma >= high)
+        next_sigma = np.where(bad_step, 0.5 * (low + high), next_sigma)
+
+        keep = ~converged
+        active, sigma, low, high = active[keep], next_sigma[keep], low[keep], high[keep]
+
+    # contracts left in the working set ran out of iterations
+    reasons[active] = 'no_convergence'
+
+    if return_rejections:
+        return iv.reshape(shape), count_rejections(reasons)
+    return iv.reshape(shape)
@@ -1,13 +1,14 @@
+import os
 import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
-import yfinance as yf
 
 from bsm_model import black_scholes_merton
 from payoff_diag import plot_payoff_diagram
 from implied_volatility import implied_volatility
 from monte_carlo import price_asian_option_mc
-from volatility_smile import plot_volatility_smile
+from market_data import get_provider
+from volatility_smile import build_iv_surface, plot_volatility_smile, plot_volatility_surface
 
 #  --- Streamlit App Layout ---
 
@@ -89,44 +90,87 @@ with tab2:
     st.subheader("Simulation Parameters")
     num_simulations = st.slider("Number of Simulations", min_value=1000, max_value=100000, value=10000, step=1000)
     steps = st.slider("Time Steps per Path", min_value=50, max_value=500, value=252, step=1)
+    n_threads = st.number_input("Engine Threads", min_value=1, max_value=256, value=os.cpu_count() or 1, step=1,
+                                help="Native threads used by the C++ engine. Results are identical for any thread count.")
+
+    use_qmc = st.checkbox("Quasi-Monte Carlo (Sobol + Brownian Bridge)",
+                          help="Low-discrepancy points instead of pseudo-random numbers. Combines with the control variate only.")
+
+    st.markdown("**Variance Reduction**")
+    col_av, col_cv, col_mm = st.columns(3)
+    with col_av:
+        use_antithetic = st.checkbox("Antithetic Variates", disabled=use_qmc)
+    with col_cv:
+        use_control_variate = st.checkbox("Geometric Control Variate", value=True)
+    with col_mm:
+        use_moment_matching = st.checkbox("Moment Matching", disabled=use_qmc)
 
     if st.button("Run Monte Carlo Simulation"):
         with st.spinner(f"Running {num_simulations:,} simulations... This may take a moment."):
             # Call the pricing function using the correctly defined variables from the sidebar
-            asian_price, paths = price_asian_option_mc(S, EX, T, r, sigma, num_simulations, steps, option_type)
+            mc_result = price_asian_option_mc(S, EX, T, r, sigma, num_simulations, steps, option_type,
+                                              n_threads=int(n_threads),
+                                              antithetic=use_antithetic and not use_qmc,
+                                              control_variate=use_control_variate,
+                                              moment_matching=use_moment_matching and not use_qmc,
+                                              qmc=use_qmc)
 
             st.success("Simulation Complete!")
             
             # Display the result
-            st.metric(f"Asian {option_type.capitalize()} Price", f"${asian_price:.3f}")
+            col_price, col_se, col_eff = st.columns(3)
+            with col_price:
+                st.metric(f"Asian {option_type.capitalize()} Price", f"${mc_result['price']:.3f}")
+            with col_se:
+                st.metric("Standard Error", f"${mc_result['std_error']:.4f}")
+            with col_eff:
+                st.metric("Effective Paths", f"{mc_result['n_effective']:,.0f}",
+                          help="Plain Monte Carlo paths needed to reach the same standard error.")
 
             # Display the plot of sample paths
             st.subheader("Sample of Simulated Price Paths")
-            st.line_chart(paths)
+            st.line_chart(mc_result['paths'])
 
 # --- Tab 3: Volatility Smile ---
+
+# The surface is fetched and solved once per ticker/spot/rate and reused across reruns
+# (e.g. when switching expiry or side), refreshing every 15 minutes.
+@st.cache_data(ttl=900, show_spinner=False)
+def load_iv_surface(ticker, S, r):
+    return build_iv_surface(ticker, S, r)
+
 with tab3:
     st.header("Implied Volatility Smile/Skew")
-    st.markdown("Fetch live options data to calculate and plot the implied volatility for an options chain.")
+    st.markdown("Fetch live options data to calculate and plot the implied volatility for every listed expiration.")
     
     ticker = st.text_input("Enter Stock Ticker", "AAPL").upper()
     
     if st.button("Fetch & Plot Smile"):
         # We need the current stock price for the IV calculation, so we fetch it.
         try:
-            stock_info = yf.Ticker(ticker)
-            current_S = stock_info.history(period='1d')['Close'].iloc[0]
-            st.info(f"Using current market price for {ticker}: ${current_S:.2f}")
+            current_S = get_provider().get_spot(ticker)
+            price_source = "current market price"
         except IndexError:
-            st.error(f"Could not fetch current price for {ticker}. Using sidebar value: ${S:.2f}")
             current_S = S # Fallback to sidebar value
-
-        with st.spinner(f"Fetching options data for {ticker}..."):
-            # Note: We pass current_S to the function now
-            smile_fig = plot_volatility_smile(ticker, current_S, T, r)
-            if smile_fig:
-                st.pyplot(smile_fig)
-            else:
-                st.error(f"Could not fetch options data for {ticker}. Please check the ticker or try again later.")
-
-
+            price_source = "sidebar value (could not fetch the current price)"
+        # Remember the request so the expiry/side widgets below can rerun the script
+        st.session_state['smile_request'] = (ticker, float(current_S), price_source)
+
+    if 'smile_request' in st.session_state:
+        smile_ticker, current_S, price_source = st.session_state['smile_request']
+        st.info(f"Using {price_source} for {smile_ticker}: ${current_S:.2f}")
+
+        with st.spinner(f"Fetching options data for all expirations of {smile_ticker}..."):
+            surface = load_iv_surface(smile_ticker, current_S, r)
+
+        if surface is None:
+            st.error(f"Could not fetch options data for {smile_ticker}. Please check the ticker or try again later.")
+        else:
+            exp_date = st.selectbox("Expiration Date", surface['expiries'])
+            st.pyplot(plot_volatility_smile(surface, smile_ticker, current_S, exp_date))
+
+            st.subheader("Implied Volatility Surface")
+            side = st.radio("Option Side", ('Calls', 'Puts'), horizontal=True, key="surface_side")
+            surface_fig = plot_volatility_surface(surface, smile_ticker, side.lower())
+            if surface_fig:
+                st.pyplot(surface_fig)
@@ -0,0 +1,121 @@
+# Market data providers
+# Everything the app needs from the market (spot prices and option chains) goes through a
+# MarketDataProvider, so the pricing code does not care whether quotes come from yfinance
+# or from a deterministic offline stand-in used for tests and benchmarks.
+
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from bsm_model import black_scholes_merton_vec
+
+# Environment variable selecting the provider used by get_provider(): 'yfinance' or 'synthetic'
+PROVIDER_ENV_VAR = 'MARKET_DATA_PROVIDER'
+
+
+class MarketDataProvider:
+    """Interface for spot prices and option chains."""
+
+    def get_spot(self, ticker):
+        """Latest price of the underlying, as a float. Raises IndexError if unavailable."""
+        raise NotImplementedError
+
+    def get_option_expiries(self, ticker):
+        """Listed expiration dates as 'YYYY-MM-DD' strings (empty if none)."""
+        raise NotImplementedError
+
+    def get_option_chain(self, ticker, expiry):
+        """Quotes for one expiry: DataFrame with columns 'strike', 'lastPrice' and 'isCall'."""
+        raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from Yahoo Finance."""
+
+    def get_spot(self, ticker):
+        import yfinance as yf
+        return float(yf.Ticker(ticker).history(period='1d')['Close'].iloc[0])
+
+    def get_option_expiries(self, ticker):
+        import yfinance as yf
+        return list(yf.Ticker(ticker).options)
+
+    def get_option_chain(self, ticker, expiry):
+        import yfinance as yf
+        # one Ticker per call, so concurrent fetches do not share state
+        opt_chain = yf.Ticker(ticker).option_chain(expiry)
+        return pd.concat([opt_chain.calls.assign(isCall=True), opt_chain.puts.assign(isCall=False)],
+                         ignore_index=True)[['strike', 'lastPrice', 'isCall']]
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Deterministic offline market: option chains priced with Black-Scholes-Merton on a
+    skewed volatility smile, with a little quote noise and a share of stale quotes.
+
+    The same (seed, ticker, as_of) always produces the same data, so runs are reproducible
+    without a network connection.
+    """
+
+    def __init__(self, seed=0, r=0.05, atm_vol=0.25, skew=-0.1, smile=0.1, n_expiries=8,
+                 stale_fraction=0.05, as_of=None):
+        self.seed = seed
+        self.r = r
+        self.atm_vol = atm_vol
+        self.skew = skew
+        self.smile = smile
+        self.n_expiries = n_expiries
+        self.stale_fraction = stale_fraction
+        self.as_of = pd.Timestamp.now().normalize() if as_of is None else pd.Timestamp(as_of).normalize()
+
+    def _rng(self, *keys):
+        # independent, reproducible stream per (seed, keys)
+        return np.random.default_rng([self.seed] + [zlib.crc32(str(k).encode()) for k in keys])
+
+    def get_spot(self, ticker):
+        return float(np.round(self._rng(ticker, 'spot').uniform(20, 500), 2))
+
+    def get_option_expiries(self, ticker):
+        # monthly expiries: third Friday of each of the next n_expiries months
+        months = pd.date_range(self.as_of + pd.offsets.MonthBegin(0), periods=self.n_expiries + 1, freq='MS')
+        fridays = [m + pd.offsets.WeekOfMonth(week=2, weekday=4) for m in months]
+        return [f.strftime('%Y-%m-%d') for f in fridays if f > self.as_of][:self.n_expiries]
+
+    def get_option_chain(self, ticker, expiry):
+        S = self.get_spot(ticker)
+        T = max((pd.Timestamp(expiry) - self.as_of).days, 1) / 365.0
+        strikes = np.round(S * np.linspace(0.6, 1.4, 41), 1)
+
+        # smile in log-moneyness, flattening with maturity
+        k = np.log(strikes / S) / np.sqrt(T)
+        vol = np.maximum(self.atm_vol + self.skew * k + self.smile * k ** 2, 0.05)
+
+        rng = self._rng(ticker, expiry)
+        strike_all = np.concatenate([strikes, strikes])
+        is_call = np.repeat([True, False], strikes.size)
+        price = black_scholes_merton_vec(S, strike_all, T, self.r, np.concatenate([vol, vol]), is_call)[0]
+        price = price * (1 + rng.normal(0, 0.01, price.size))
+
+        # stale quotes: last trades that are now far from fair value
+        stale = rng.random(price.size) < self.stale_fraction
+        price[stale] *= rng.uniform(0.0, 0.5, stale.sum())
+
+        return pd.DataFrame({'strike': strike_all, 'lastPrice': np.round(np.maximum(price, 0.0), 2),
+                             'isCall': is_call})
+
+
+def get_provider(name=None):
+    """
+    Returns the market data provider called name ('yfinance' or 'synthetic').
+
+    Defaults to the MARKET_DATA_PROVIDER environment variable, then to 'yfinance'.
+    """
+    name = (name or os.environ.get(PROVIDER_ENV_VAR, 'yfinance')).lower()
+    if name == 'yfinance':
+        return YFinanceProvider()
+    elif name == 'synthetic':
+        return SyntheticProvider()
+    else:
+        raise ValueError(f"Unknown market data provider '{name}'. Use 'yfinance' or 'synthetic'.")
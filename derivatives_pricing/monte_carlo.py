@@ -1,10 +1,47 @@
 import numpy as np
+import scipy.stats as si
+from scipy.stats import qmc as si_qmc
 import mc_engine_cpp  # type: ignore
 
-def price_asian_option_mc(S0, K, T, r, sigma, num_simulations, steps, option_type='call'):
+# Sobol points are fed to the engine in blocks of this many rows to bound memory
+QMC_BLOCK = 2 ** 14
+
+def geometric_asian_price(S0, K, T, r, sigma, steps, option_type='call'):
+    """
+    Closed-form price of a discretely monitored geometric-average Asian option.
+
+    The geometric average of S_1 .. S_steps under GBM is lognormal, so the option
+    prices like a European one on that average (Kemna & Vorst).
+
+    Returns:
+        float: The discounted option price.
+    """
+    n = steps
+    # mean and variance of the log of the geometric average
+    mu = np.log(S0) + (r - 0.5 * sigma ** 2) * T * (n + 1) / (2 * n)
+    var = sigma ** 2 * T * (n + 1) * (2 * n + 1) / (6 * n ** 2)
+
+    d2 = (mu - np.log(K)) / np.sqrt(var)
+    d1 = d2 + np.sqrt(var)
+    forward = np.exp(mu + 0.5 * var)
+
+    if option_type == 'call':
+        return np.exp(-r * T) * (forward * si.norm.cdf(d1) - K * si.norm.cdf(d2))
+    elif option_type == 'put':
+        return np.exp(-r * T) * (K * si.norm.cdf(-d2) - forward * si.norm.cdf(-d1))
+    else:
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+
+def price_asian_option_mc(S0, K, T, r, sigma, num_simulations, steps, option_type='call', average='arithmetic',
+                          seed=None, n_threads=0, n_sample_paths=100,
+                          antithetic=False, control_variate=False, moment_matching=False,
+                          qmc=False, replications=8):
     """
     Prices an Asian option using the C++ accelerated Monte Carlo engine.
 
+    Paths are never stored in full: the engine keeps a running average per path and
+    reduces it to a payoff as it goes, so memory grows with num_simulations only.
+
     Args:
         S0 (float): Initial stock price.
         K (float): Strike price.
@@ -14,38 +51,104 @@ def price_asian_option_mc(S0, K, T, r, sigma, num_simulations, steps, option_typ
         num_simulations (int): The number of paths to simulate.
         steps (int): The number of time steps in each path.
         option_type (str): 'call' or 'put'.
+        average (str): 'arithmetic' or 'geometric' average of the path prices.
+        seed (int, optional): Seed for reproducible runs. None draws a fresh seed.
+        n_threads (int): Native threads used by the engine. 0 uses every core.
+        n_sample_paths (int): Number of full paths to keep for plotting.
+        antithetic (bool): Pair every path with its mirror image (Z -> -Z).
+        control_variate (bool): Use the geometric-average payoff, whose price is known in
+            closed form, as a control variate.
+        moment_matching (bool): Rescale the normals so each time step has sample mean 0 and
+            variance 1. Matching makes the paths dependent, so num_simulations is split into
+            `replications` batches matched independently, and the standard error comes from
+            the spread of the batch estimates.
+        qmc (bool): Use scrambled Sobol points with a Brownian-bridge path construction
+            instead of pseudo-random normals. num_simulations is split into `replications`
+            independent scrambles of 2^m points each, and the standard error comes from the
+            spread of the replicate estimates.
+        replications (int): Number of independent batches in moment-matching mode, or of
+            independent scrambles in QMC mode.
 
     Returns:
-        tuple: A tuple containing the option price and a sample of paths for plotting.
+        dict: 'price' (discounted option price), 'std_error' (standard error of the price),
+        'n_effective' (plain Monte Carlo paths needed for the same standard error) and
+        'paths' (sample paths for plotting, one column per path).
+    """
+    if average not in ('arithmetic', 'geometric'):
+        raise ValueError("Invalid average. Use 'arithmetic' or 'geometric'.")
+
+    # closed-form geometric price anchors the control variate; NaN switches it off
+    control_price = geometric_asian_price(S0, K, T, r, sigma, steps, option_type) if control_variate else np.nan
+
+    if qmc:
+        if antithetic or moment_matching:
+            raise ValueError("QMC mode supports the control variate only.")
+        return _price_asian_option_qmc(S0, K, T, r, sigma, num_simulations, steps, option_type, average,
+                                       seed, n_threads, n_sample_paths, control_price, replications)
+
+    # C++ function simulates the paths and averages the discounted payoffs in one pass,
+    # on n_threads native threads with the GIL released
+    result = mc_engine_cpp.price_asian(S0, K, r, sigma, T, steps, num_simulations,
+                                       is_call=(option_type == 'call'),
+                                       geometric=(average == 'geometric'),
+                                       n_sample_paths=n_sample_paths,
+                                       seed=-1 if seed is None else seed,
+                                       n_threads=n_threads,
+                                       antithetic=antithetic,
+                                       moment_matching=moment_matching,
+                                       control_price=control_price,
+                                       replications=replications)
+
+    return {
+        'price': result['price'],
+        'std_error': result['std_error'],
+        'n_effective': result['n_effective'],
+        'paths': result['sample_paths'].T
+    }
+
+def _price_asian_option_qmc(S0, K, T, r, sigma, num_simulations, steps, option_type, average,
+                            seed, n_threads, n_sample_paths, control_price, replications):
     """
-    payoffs = []
-    paths_for_plotting = []
-
-    # simulation loop
-    for i in range(num_simulations):
-        # C++ function to get a single path
-        path = mc_engine_cpp.generate_single_path(S0, r, sigma, T, steps)
-        
-        #average price of the path (excluding the starting price S0)
-        average_price = np.mean(path[1:])
-
-        #payoff for this path
-        if option_type == 'call':
-            payoff = max(0, average_price - K)
-        else: # 'put'
-            payoff = max(0, K - average_price)
-        
-        payoffs.append(payoff)
-
-        # small sample of paths to visualize later
-        if i < 100: # Save the first 100 paths
-            paths_for_plotting.append(path)
-
-    # average payoff
-    average_payoff = np.mean(payoffs)
-
-    # Discount the average payoff back to the present value
-    option_price = np.exp(-r * T) * average_payoff
-    
-    return option_price, np.array(paths_for_plotting).T
+    Randomized quasi-Monte Carlo branch of price_asian_option_mc.
+
+    Each replication is an independently scrambled Sobol sequence over the steps dimensions,
+    rounded to a power of two so the points keep their balance properties. The C++ engine
+    turns the points into paths (inverse-normal transform + Brownian bridge) and payoffs.
+    """
+    points_per_replication = 2 ** max(int(np.ceil(np.log2(max(num_simulations / replications, 1)))), 1)
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(replications)]
+    discount = np.exp(-r * T)
+
+    payoffs = np.empty((replications, points_per_replication))
+    control_payoffs = np.empty((replications, points_per_replication))
+    sample_paths = None
+
+    for rep, rng in enumerate(rngs):
+        sobol = si_qmc.Sobol(d=steps, scramble=True, seed=rng)
+        for start in range(0, points_per_replication, QMC_BLOCK):
+            n_block = min(QMC_BLOCK, points_per_replication - start)
+            block = mc_engine_cpp.price_asian_qmc(sobol.random(n_block), S0, K, r, sigma, T,
+                                                  is_call=(option_type == 'call'),
+                                                  geometric=(average == 'geometric'),
+                                                  n_sample_paths=n_sample_paths if sample_paths is None else 0,
+                                                  n_threads=n_threads)
+            payoffs[rep, start:start + n_block] = block['payoffs']
+            control_payoffs[rep, start:start + n_block] = block['control_payoffs']
+            if sample_paths is None:
+                sample_paths = block['sample_paths']
+
+    # one estimate per replication; the control coefficient is pooled over all points
+    estimates = payoffs.mean(axis=1)
+    if np.isfinite(control_price):
+        b = np.cov(payoffs.ravel(), control_payoffs.ravel())[0, 1] / control_payoffs.var(ddof=1)
+        estimates = estimates - b * (control_payoffs.mean(axis=1) - control_price / discount)
+
+    std_error = discount * estimates.std(ddof=1) / np.sqrt(replications)
+    plain_variance = discount ** 2 * payoffs.var(ddof=1)
 
+    return {
+        'price': discount * estimates.mean(),
+        'std_error': std_error,
+        'n_effective': plain_variance / std_error ** 2 if std_error > 0 else float(payoffs.size),
+        'paths': sample_paths.T
+    }
@@ -1,65 +1,174 @@
-import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from implied_volatility import implied_volatility
+from implied_volatility import implied_volatility_vec
+from market_data import get_provider
+
+# US listed options stop trading at 16:00 New York time on the expiration date
+EXPIRY_CLOSE = '16:00'
+EXPIRY_TZ = 'America/New_York'
+SECONDS_PER_YEAR = 365 * 24 * 3600
 
-def plot_volatility_smile(ticker, S, T, r):
+
+def fetch_option_chains(ticker, max_workers=8, provider=None):
     """
-    Fetches options chain data for a given ticker, calculates implied volatility
-    for each option, and plots the resulting volatility smile.
+    Fetches the options chain for every listed expiration date, concurrently.
+
+    Args:
+        ticker (str): The stock ticker (e.g., 'AAPL').
+        max_workers (int): Number of threads fetching expirations in parallel.
+        provider (MarketDataProvider, optional): Source of the chains. Defaults to get_provider().
+
+    Returns:
+        pd.DataFrame: One row per quote with columns 'expiry', 'strike', 'lastPrice' and
+        'isCall'. Empty if the ticker has no listed options.
+    """
+    provider = get_provider() if provider is None else provider
+    expiries = provider.get_option_expiries(ticker)
+
+    def fetch(exp_date):
+        # chain requests are network-bound, so threads overlap the waits
+        return provider.get_option_chain(ticker, exp_date).assign(expiry=exp_date)
+
+    if not expiries:
+        return pd.DataFrame(columns=['expiry', 'strike', 'lastPrice', 'isCall'])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        chains = list(pool.map(fetch, expiries))
+
+    return pd.concat(chains, ignore_index=True)[['expiry', 'strike', 'lastPrice', 'isCall']]
+
+
+def build_iv_surface(ticker, S, r, max_workers=8, now=None, provider=None):
+    """
+    Builds the implied volatility surface across all listed expirations.
+
+    Each expiration gets its own time to maturity (to 16:00 New York time on the expiry
+    date), and the implied volatilities of every quote on every expiry are solved in a
+    single batched call.
 
     Args:
         ticker (str): The stock ticker (e.g., 'AAPL').
         S (float): The current stock price, used for IV calculation.
-        T (float): Time to maturity in years.
         r (float): Risk-free interest rate.
+        max_workers (int): Number of threads fetching expirations in parallel.
+        now (pd.Timestamp, optional): Valuation time. Defaults to the current time.
+        provider (MarketDataProvider, optional): Source of the chains. Defaults to get_provider().
 
     Returns:
-        matplotlib.figure.Figure: The figure object for the plot, or None if data cannot be fetched.
+        dict: 'quotes' (tidy DataFrame, one row per quote with 'T' and 'impliedVolatility'),
+        'calls' and 'puts' (strike x expiry DataFrames of implied volatility), 'expiries'
+        (list of expiration dates) and 'rejections' (rejected quotes per reason).
+        None if the ticker has no listed options.
     """
-    try:
-    
-        stock = yf.Ticker(ticker)
-        
-        # first available options expiration date
-        exp_date = stock.options[0]
-        
-        # options chain for that expiration date
-        opt_chain = stock.option_chain(exp_date)
-        calls = opt_chain.calls
-        puts = opt_chain.puts
-
-    except IndexError:
+    quotes = fetch_option_chains(ticker, max_workers=max_workers, provider=provider)
+    if quotes.empty:
         return None
 
-    # Calculate Implied Volatility for both calls and puts
-    calls['impliedVolatility'] = calls.apply(
-        lambda row: implied_volatility(row['lastPrice'], S, row['strike'], T, r, 'call'),
-        axis=1
-    )
-    puts['impliedVolatility'] = puts.apply(
-        lambda row: implied_volatility(row['lastPrice'], S, row['strike'], T, r, 'put'),
-        axis=1
-    )
+    # time to maturity per expiration date
+    now = pd.Timestamp.now(tz=EXPIRY_TZ) if now is None else now
+    expiry_times = pd.to_datetime(quotes['expiry'] + ' ' + EXPIRY_CLOSE).dt.tz_localize(EXPIRY_TZ)
+    quotes['T'] = (expiry_times - now).dt.total_seconds().to_numpy() / SECONDS_PER_YEAR
+
+    # one batched solve over the whole surface
+    iv, rejections = implied_volatility_vec(quotes['lastPrice'].to_numpy(), S, quotes['strike'].to_numpy(),
+                                            quotes['T'].to_numpy(), r, quotes['isCall'].to_numpy(),
+                                            return_rejections=True)
+    quotes['impliedVolatility'] = iv
+
+    def surface(side):
+        return side.pivot_table(index='strike', columns='expiry', values='impliedVolatility', aggfunc='mean')
+
+    return {
+        'quotes': quotes,
+        'calls': surface(quotes[quotes['isCall']]),
+        'puts': surface(quotes[~quotes['isCall']]),
+        'expiries': sorted(quotes['expiry'].unique()),
+        'rejections': rejections
+    }
+
+
+def plot_volatility_smile(surface, ticker, S, exp_date=None):
+    """
+    Plots the volatility smile for one expiration date of an implied volatility surface.
+
+    Args:
+        surface (dict): The output of build_iv_surface.
+        ticker (str): The stock ticker (e.g., 'AAPL').
+        S (float): The current stock price.
+        exp_date (str, optional): Expiration date to plot. Defaults to the nearest one.
+
+    Returns:
+        matplotlib.figure.Figure: The figure object for the plot, or None if there is no data.
+    """
+    if surface is None:
+        return None
+    exp_date = surface['expiries'][0] if exp_date is None else exp_date
+    quotes = surface['quotes'][surface['quotes']['expiry'] == exp_date]
 
     fig, ax = plt.subplots(figsize=(10, 6))
-    
+
     # Filter out rows where IV calculation failed (returned NaN)
-    valid_calls = calls.dropna(subset=['impliedVolatility'])
-    valid_puts = puts.dropna(subset=['impliedVolatility'])
+    valid = quotes.dropna(subset=['impliedVolatility'])
+    valid_calls = valid[valid['isCall']]
+    valid_puts = valid[~valid['isCall']]
 
     ax.scatter(valid_calls['strike'], valid_calls['impliedVolatility'] * 100, label='Calls', color='green', marker='^')
     ax.scatter(valid_puts['strike'], valid_puts['impliedVolatility'] * 100, label='Puts', color='red', marker='v')
-    
+
     ax.set_xlabel('Strike Price ($)')
     ax.set_ylabel('Implied Volatility (%)')
     ax.set_title(f'Volatility Smile for {ticker.upper()} (Exp: {exp_date})')
-    ax.legend()
     ax.grid(True, linestyle='--', alpha=0.6)
-    
+
     # Add a vertical line for the current stock price
     ax.axvline(x=S, color='blue', linestyle='--', label=f'Current Price: ${S:.2f}')
     ax.legend()
 
+    # Report how many quotes were dropped for this expiry
+    n_rejected = len(quotes) - len(valid)
+    if n_rejected:
+        fig.text(0.5, 0.005, f"No implied volatility for {n_rejected} of {len(quotes)} quotes",
+                 ha='center', va='bottom', fontsize=9, color='grey')
+
     return fig
 
+
+def plot_volatility_surface(surface, ticker, side='calls'):
+    """
+    Plots a strike x expiry heatmap of implied volatility.
+
+    Args:
+        surface (dict): The output of build_iv_surface.
+        ticker (str): The stock ticker (e.g., 'AAPL').
+        side (str): 'calls' or 'puts'.
+
+    Returns:
+        matplotlib.figure.Figure: The figure object for the plot, or None if there is no data.
+    """
+    if surface is None or surface[side].empty:
+        return None
+    grid = surface[side]
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    mesh = ax.pcolormesh(np.arange(len(grid.columns)), grid.index, grid.to_numpy() * 100,
+                         shading='nearest', cmap='viridis')
+    fig.colorbar(mesh, ax=ax, label='Implied Volatility (%)')
+
+    ax.set_xticks(np.arange(len(grid.columns)))
+    ax.set_xticklabels(grid.columns, rotation=45, ha='right')
+    ax.set_xlabel('Expiration Date')
+    ax.set_ylabel('Strike Price ($)')
+    ax.set_title(f'Implied Volatility Surface for {ticker.upper()} ({side.capitalize()})')
+    fig.tight_layout()
+
+    # Report how many quotes were rejected across the whole surface, and why
+    rejected = {reason: count for reason, count in surface['rejections'].items() if count}
+    if rejected:
+        summary = ", ".join(f"{count} {reason.replace('_', ' ')}" for reason, count in rejected.items())
+        fig.text(0.5, 0.005, f"Rejected {sum(rejected.values())} of {len(surface['quotes'])} quotes: {summary}",
+                 ha='center', va='bottom', fontsize=9, color='grey')
+
+    return fig
@@ -0,0 +1,3 @@
+# Code shared by the projects in this repository: the on-disk price cache, the provider building
+# blocks, the daily price providers used by week_01 and week_02, and the parameter sweep engine
+# behind the week_02 and week_03 optimizers
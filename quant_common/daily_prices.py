@@ -0,0 +1,117 @@
+# Daily adjusted closing prices through a pluggable market data provider
+# (yfinance by default, cached on disk; a CSV directory or a synthetic market for offline,
+# deterministic runs). Shared by the week_01 sector dashboard and the week_02 pair explorer.
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from .price_cache import PriceCache
+from .providers import SeededSource, select_provider
+
+
+class PriceProvider:
+    """Interface for daily adjusted closing prices."""
+
+    def get_prices(self, tickers, start, end):
+        """Adjusted closes for tickers between start and end: DataFrame indexed by date, one column per ticker."""
+        raise NotImplementedError
+
+
+class YFinanceProvider(PriceProvider):
+    """Live data from Yahoo Finance."""
+
+    def get_prices(self, tickers, start, end):
+        import yfinance as yf
+        return yf.download(list(tickers), start=start, end=end, auto_adjust=True)['Close']
+
+
+class CSVProvider(PriceProvider):
+    """
+    Prices from a directory of <TICKER>.csv files, each with a date column (first column)
+    and a 'Close' column, e.g. files saved from an earlier yfinance download.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def get_prices(self, tickers, start, end):
+        closes = {}
+        for ticker in tickers:
+            df = pd.read_csv(os.path.join(self.directory, f'{ticker}.csv'), index_col=0, parse_dates=True)
+            closes[ticker] = df['Close']
+        prices = pd.DataFrame(closes)
+        return prices.loc[(prices.index >= pd.Timestamp(start)) & (prices.index < pd.Timestamp(end))]
+
+
+class CachedProvider(PriceProvider):
+    """
+    Wraps another provider with the on-disk PriceCache, so each ticker's history is downloaded
+    once and later requests only fetch the dates not seen before.
+    """
+
+    def __init__(self, provider, cache=None):
+        self.provider = provider
+        self.cache = PriceCache() if cache is None else cache
+
+    def get_prices(self, tickers, start, end):
+        closes = []
+        for ticker in tickers:
+            def fetch(span_start, span_end, ticker=ticker):
+                prices = self.provider.get_prices([ticker], span_start, span_end)
+                return prices.to_frame(ticker) if isinstance(prices, pd.Series) else prices[[ticker]]
+            closes.append(self.cache.get(ticker, '1d', start, end, fetch))
+        return pd.concat(closes, axis=1)
+
+
+class SyntheticProvider(PriceProvider, SeededSource):
+    """
+    Deterministic synthetic market for offline runs and benchmarks.
+
+    Every ticker is a lognormal price driven by one common market factor plus its own
+    mean-reverting (Ornstein-Uhlenbeck) component, so any two tickers form a cointegrated
+    pair. Histories are simulated on a fixed business-day calendar from BASE_DATE and then
+    sliced, so the same (seed, ticker, date) gives the same price whatever range is asked for.
+    """
+
+    BASE_DATE = '2000-01-03'
+
+    def __init__(self, seed=0, market_vol=0.18, idio_vol=0.10, half_life=20):
+        self.seed = seed
+        self.market_vol = market_vol
+        self.idio_vol = idio_vol
+        self.half_life = half_life
+
+    def get_prices(self, tickers, start, end):
+        dates = pd.bdate_range(self.BASE_DATE, pd.Timestamp(end) - pd.Timedelta(days=1))
+        n = len(dates)
+        dt = 1 / 252
+
+        market = np.cumsum(self._rng('market').normal(0.05 * dt, self.market_vol * np.sqrt(dt), n))
+        phi = 0.5 ** (1 / self.half_life)  # daily OU persistence
+
+        closes = {}
+        for ticker in tickers:
+            rng = self._rng(ticker)
+            price0, beta = rng.uniform(20, 300), rng.uniform(0.6, 1.4)
+            shocks = rng.normal(0, self.idio_vol * np.sqrt(dt), n)
+            idio = lfilter([1.0], [1.0, -phi], shocks)  # AR(1): idio[i] = phi * idio[i-1] + shocks[i]
+            closes[ticker] = price0 * np.exp(beta * market + idio)
+
+        prices = pd.DataFrame(closes, index=dates)
+        prices.index.name = 'Date'
+        return prices.loc[prices.index >= pd.Timestamp(start)]
+
+
+def get_provider(name=None):
+    """
+    Returns the price provider called name: 'yfinance', 'synthetic' or 'csv:<directory>'.
+    Yahoo Finance downloads go through the on-disk PriceCache.
+
+    Defaults to the MARKET_DATA_PROVIDER environment variable, then to 'yfinance'.
+    """
+    return select_provider(name, {'yfinance': lambda: CachedProvider(YFinanceProvider()),
+                                  'synthetic': SyntheticProvider,
+                                  'csv': CSVProvider})
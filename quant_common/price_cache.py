@@ -0,0 +1,139 @@
+# On-disk cache for downloaded price history
+# One Arrow IPC file per (ticker, interval) holds every bar fetched so far, and its schema metadata
+# records which date spans have been fetched. A request downloads only the spans not covered yet,
+# reads are memory-mapped, and the least recently used files are evicted once the cache outgrows
+# its size limit.
+
+import json
+import os
+import re
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+
+# Environment variable overriding the cache directory
+CACHE_DIR_ENV_VAR = 'MARKET_DATA_CACHE_DIR'
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'quant_stuff')
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+
+COVERAGE_KEY = b'coverage'
+
+
+def merge_spans(spans):
+    """Sorts [start, end) date spans and merges the ones that overlap or touch."""
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_spans(covered, start, end):
+    """Parts of [start, end) not inside any of the (merged, sorted) covered spans."""
+    gaps = []
+    for span_start, span_end in covered:
+        if span_end <= start or span_start >= end:
+            continue
+        if span_start > start:
+            gaps.append((start, span_start))
+        start = max(start, span_end)
+    if start < end:
+        gaps.append((start, end))
+    return gaps
+
+
+class PriceCache:
+    """
+    Size-bounded on-disk cache of bar data.
+
+    Parameters:
+    - directory: Where the cache files live (defaults to MARKET_DATA_CACHE_DIR, then ~/.cache/quant_stuff)
+    - max_bytes: Total size above which the least recently used files are deleted
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get(CACHE_DIR_ENV_VAR, DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, ticker, interval):
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', f'{ticker}_{interval}')
+        return os.path.join(self.directory, name + '.arrow')
+
+    def read(self, ticker, interval):
+        """Cached bars and covered spans for (ticker, interval): (DataFrame or None, list of spans)."""
+        path = self.path(ticker, interval)
+        if not os.path.exists(path):
+            return None, []
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        metadata = table.schema.metadata or {}
+        covered = [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in json.loads(metadata.get(COVERAGE_KEY, b'[]'))]
+        os.utime(path)  # mark as recently used
+        return table.to_pandas(), covered
+
+    def write(self, ticker, interval, data, covered):
+        """Stores the bars and their covered spans, then evicts old files if over the size limit."""
+        table = pa.Table.from_pandas(data)
+        coverage = json.dumps([(s.isoformat(), e.isoformat()) for s, e in covered]).encode()
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), COVERAGE_KEY: coverage})
+
+        # write to a temporary file and swap it in, so readers never see a partial file
+        path = self.path(ticker, interval)
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """Deletes the least recently used files until the cache fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.arrow'):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(self.directory, name)))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                os.remove(path)
+                total -= size
+
+    def get(self, ticker, interval, start, end, fetch):
+        """
+        Bars for ticker at interval between the dates start (inclusive) and end (exclusive).
+
+        fetch(span_start, span_end) is called only for the spans the cache does not cover yet,
+        and must return a DataFrame indexed by bar timestamp. Spans reaching today are fetched
+        but not recorded as covered, since today's bars are still coming in.
+        """
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        data, covered = self.read(ticker, interval)
+
+        gaps = missing_spans(covered, start, end)
+        if gaps:
+            parts = [data] if data is not None else []
+            parts += [fetch(span_start, span_end) for span_start, span_end in gaps]
+            parts = [part for part in parts if len(part)]
+            if parts:
+                data = pd.concat(parts)
+                data = data[~data.index.duplicated(keep='last')].sort_index()
+
+            today = pd.Timestamp.now().normalize()
+            new_spans = [(s, min(e, today)) for s, e in gaps if min(e, today) > s]
+            if data is not None and new_spans:
+                self.write(ticker, interval, data, merge_spans(covered + new_spans))
+
+        if data is None:
+            return pd.DataFrame()
+
+        # dates are local to the bars' own time zone
+        tz = getattr(data.index, 'tz', None)
+        lower, upper = (start, end) if tz is None else (start.tz_localize(tz), end.tz_localize(tz))
+        return data.loc[(data.index >= lower) & (data.index < upper)]
@@ -0,0 +1,45 @@
+# Building blocks shared by the market data provider stacks of week_01, week_02 and week_03
+# Each project defines its own provider interface (daily closes, intraday bars); the environment
+# switch, the reproducible random streams of the synthetic sources and the name lookup behind each
+# project's get_provider() live here. derivatives_pricing is deployed on its own from its folder, so
+# its option-chain providers keep a local copy of these few lines.
+
+import os
+import zlib
+
+import numpy as np
+
+# Environment variable naming the provider get_provider() returns:
+# 'yfinance', 'synthetic' or, where a project supports it, 'csv:<directory>'
+PROVIDER_ENV_VAR = 'MARKET_DATA_PROVIDER'
+
+
+class SeededSource:
+    """
+    Base for deterministic synthetic providers. Subclasses set self.seed; every draw comes
+    from a stream keyed by (seed, *keys), so the same keys give the same data in any order.
+    """
+
+    seed = 0
+
+    def _rng(self, *keys):
+        # independent, reproducible stream per (seed, keys)
+        return np.random.default_rng([self.seed] + [zlib.crc32(str(k).encode()) for k in keys])
+
+
+def select_provider(name, factories):
+    """
+    Builds the provider called name from factories, a dict mapping 'yfinance', 'synthetic'
+    and optionally 'csv' to constructors ('csv' is called with the directory of 'csv:<directory>').
+
+    name defaults to the MARKET_DATA_PROVIDER environment variable, then to 'yfinance'.
+    """
+    name = name or os.environ.get(PROVIDER_ENV_VAR, 'yfinance')
+    key = name.lower()
+    if key.startswith('csv:') and 'csv' in factories:
+        return factories['csv'](name[4:])
+    if key in factories and key != 'csv':
+        return factories[key]()
+
+    choices = [f"'{kind}'" for kind in factories if kind != 'csv'] + (["'csv:<directory>'"] if 'csv' in factories else [])
+    raise ValueError(f"Unknown market data provider '{name}'. Use {', '.join(choices[:-1])} or {choices[-1]}.")
@@ -0,0 +1,75 @@
+# Parameter sweep engine shared by the pairs-trading optimizers
+# A sweep backtests (window, entry_threshold, exit_threshold) combinations. They are grouped by window,
+# so whatever depends on the window alone (the z-score) is computed once per group; groups are spread
+# over a process pool and the results come back as one ranked table. Each project supplies the
+# evaluation of one group for its own strategy.
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+RESULT_COLUMNS = ['window', 'entry_threshold', 'exit_threshold', 'sharpe', 'pnl', 'max_drawdown', 'trades']
+
+
+def performance(equity, positions, periods_per_year=252):
+    """
+    Annualized Sharpe ratio, PnL, maximum drawdown (as a fraction) and number of trades,
+    from arrays of equity and positions per bar.
+    """
+    returns = equity[1:] / equity[:-1] - 1
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    sharpe = returns.mean() / std * np.sqrt(periods_per_year) if std > 0 else np.nan
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    trades = int(np.count_nonzero((positions[1:] != 0) & (positions[:-1] == 0)) + (positions[0] != 0))
+    return sharpe, equity[-1] - equity[0], drawdown.min(), trades
+
+
+def unscored_rows(window, thresholds):
+    """Result rows for a window too long for the data: no Sharpe ratio, no PnL, no trades."""
+    return [(window, entry_threshold, exit_threshold, np.nan, 0.0, 0.0, 0)
+            for entry_threshold, exit_threshold in thresholds]
+
+
+def grid_params(windows, entry_thresholds, exit_thresholds):
+    """Every combination of the given windows, entry and exit thresholds."""
+    return itertools.product(windows, entry_thresholds, exit_thresholds)
+
+
+def random_params(n_samples, window_range, entry_range=(0.5, 3.0), exit_range=(0.0, 1.0), seed=None):
+    """
+    n_samples random combinations: windows drawn as integers from window_range (inclusive),
+    thresholds uniformly from entry_range and exit_range.
+    """
+    rng = np.random.default_rng(seed)
+    windows = rng.integers(window_range[0], window_range[1] + 1, n_samples)
+    entries = rng.uniform(*entry_range, n_samples)
+    exits = rng.uniform(*exit_range, n_samples)
+    return zip(windows, entries, exits)
+
+
+def run_window_sweep(evaluate, params, make_task, max_workers=None):
+    """
+    Backtests every (window, entry_threshold, exit_threshold) in params.
+
+    Parameters are grouped by window; make_task(window, thresholds) builds the task for one
+    group (in this process) and evaluate(task) returns its result rows, one per (entry, exit)
+    pair, in RESULT_COLUMNS order. evaluate must be a module-level function, as the groups run
+    in a process pool of max_workers processes (None uses every core, 1 runs in this process).
+
+    Returns a DataFrame with one row per combination, ranked by Sharpe ratio.
+    """
+    by_window = {}
+    for window, entry_threshold, exit_threshold in params:
+        by_window.setdefault(int(window), []).append((entry_threshold, exit_threshold))
+    tasks = [make_task(window, thresholds) for window, thresholds in by_window.items()]
+
+    if max_workers == 1:
+        results = map(evaluate, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(evaluate, tasks))
+
+    table = pd.DataFrame([row for rows in results for row in rows], columns=RESULT_COLUMNS)
+    return table.sort_values(['sharpe', 'pnl'], ascending=False, na_position='last').reset_index(drop=True)
@@ -0,0 +1,138 @@
+# Rolling covariance and correlation matrices of many assets through time
+# Each bar updates running sums of the returns and their outer products in O(N^2) (the new bar is
+# added and, for a fixed window, the bar leaving it subtracted) instead of recomputing the window, and
+# each (N x N) estimate is written straight into a (time x N x N) array, memory-mapped to an .npy file
+# when it would not fit in RAM.
+
+import numpy as np
+from scipy.linalg.blas import dger
+
+
+def rolling_covariance(returns, window=60, halflife=None, shrinkage=False, correlation=False, path=None,
+                       dtype=np.float64):
+    '''
+    Rolling covariance (or correlation) matrix of the columns of returns at every date.
+
+    - returns: DataFrame of returns (dates x assets) without missing values
+    - window: Days in each equal-weighted window; with halflife, the days of warm-up before the
+      first estimate
+    - halflife: Exponentially weighted estimates with this half-life in days instead of a fixed
+      window (the same weights as pandas ewm(halflife=...) with adjust=True)
+    - shrinkage: Shrinks each window's covariance towards a scaled identity with the Ledoit-Wolf
+      intensity (as sklearn's LedoitWolf), which keeps the matrix well-conditioned when there
+      are nearly as many assets as days; equal-weighted windows only
+    - correlation: Returns correlation matrices instead of covariances
+    - path: .npy file to memory-map the output to (np.load(path, mmap_mode='r') reopens it);
+      in memory if None
+    - dtype: np.float64, or np.float32 to halve the size of the output
+
+    Returns an array of shape (dates, assets, assets), NaN before the first full window; axis 0
+    follows returns.index, axes 1 and 2 follow returns.columns. Sample (unbiased) covariances,
+    except with shrinkage, which like sklearn works from the maximum-likelihood covariance.
+    '''
+    if halflife is not None and shrinkage:
+        raise ValueError("Ledoit-Wolf shrinkage needs equal weights; use a window without halflife.")
+    X = returns.to_numpy(dtype=np.float64)
+    if np.isnan(X).any():
+        raise ValueError("returns has missing values; drop or fill them first.")
+    n_days, n_assets = X.shape
+
+    if path is None:
+        out = np.empty((n_days, n_assets, n_assets), dtype=dtype)
+    else:
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(n_days, n_assets, n_assets))
+    out[:min(window - 1, n_days)] = np.nan
+
+    # returns are centered before summing (covariances are unchanged), which keeps the running sums small
+    X = X - X.mean(axis=0)
+    decay = 0.5 ** (1 / halflife) if halflife is not None else None
+
+    # running sums over the window (weighted sums with exponential weighting): weights, squared
+    # weights, x, x x^T and, for the shrinkage intensity, |x|^2 x and |x|^4
+    W = W2 = 0.0
+    S = np.zeros(n_assets)
+    P = np.zeros((n_assets, n_assets))
+    V = np.zeros(n_assets)
+    Q4 = 0.0
+    cov = np.empty((n_assets, n_assets))  # reused for each date's estimate
+
+    for t in range(n_days):
+        x = X[t]
+        norm2 = x @ x
+        if decay is not None:
+            W, W2 = decay * W + 1, decay * decay * W2 + 1
+            S *= decay
+            P *= decay
+            S += x
+            _rank_one_update(P, 1.0, x)
+        elif t >= window and t % window == 0:
+            # recompute the window sums exactly once per window length, so rounding errors from
+            # adding and removing bars never build up (O(N^2) per bar on average)
+            block = X[t - window + 1:t + 1]
+            norms = np.einsum('ij,ij->i', block, block)
+            S, P = block.sum(axis=0), block.T @ block
+            V, Q4 = norms @ block, norms @ norms
+        else:
+            S += x
+            _rank_one_update(P, 1.0, x)
+            V += norm2 * x
+            Q4 += norm2 * norm2
+            if t >= window:
+                old = X[t - window]
+                old_norm2 = old @ old
+                S -= old
+                _rank_one_update(P, -1.0, old)
+                V -= old_norm2 * old
+                Q4 -= old_norm2 * old_norm2
+            W = W2 = min(t + 1, window)
+
+        if t < window - 1:
+            continue
+
+        # maximum-likelihood (weighted) covariance P / W - mean mean^T, made unbiased (n / (n - 1)
+        # for equal weights) unless it is shrunk
+        mean = S / W
+        factor = 1.0 if shrinkage else W * W / (W * W - W2)
+        np.multiply(P, factor / W, out=cov)
+        _rank_one_update(cov, -factor, mean)
+        if shrinkage:
+            _ledoit_wolf(cov, mean, P, V, Q4, W)
+        if correlation:
+            scale = 1 / np.sqrt(np.diag(cov))
+            cov *= scale
+            cov *= scale[:, None]
+            np.fill_diagonal(cov, 1.0)
+        out[t] = cov
+
+    if path is not None:
+        out.flush()
+    return out
+
+
+def _rank_one_update(A, alpha, x):
+    # A += alpha x x^T in place with BLAS; A is symmetric and C-ordered, so its transpose is the
+    # same matrix in the Fortran order dger updates without a copy
+    dger(alpha, x, x, a=A.T, overwrite_a=True)
+
+
+def _ledoit_wolf(cov, mean, P, V, Q4, n):
+    # sklearn's ledoit_wolf_shrinkage on the window, applied to cov in place; its sum over days of
+    # |x_t - mean|^4 is rebuilt from the running sums |x|^4, |x|^2 x and x x^T around the window mean
+    p = len(mean)
+    m2 = mean @ mean
+    fourth = Q4 - 4 * mean @ V + 4 * mean @ P @ mean + 2 * m2 * np.trace(P) - 3 * n * m2 * m2
+
+    mu = np.trace(cov) / p
+    delta_ = np.vdot(cov, cov)
+    delta = (delta_ - 2 * mu * np.trace(cov) + p * mu * mu) / p
+    beta = min((fourth / n - delta_) / (p * n), delta)
+    intensity = 0.0 if beta <= 0 else beta / delta
+
+    cov *= 1 - intensity
+    cov.flat[::p + 1] += intensity * mu
+
+
+def average_correlation(corr):
+    '''Mean pairwise correlation (off-diagonal entries) at each date of a (dates x N x N) correlation array.'''
+    n_assets = corr.shape[1]
+    return (np.sum(corr, axis=(1, 2)) - n_assets) / (n_assets * (n_assets - 1))
@@ -3,8 +3,13 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-import yfinance as yf
 from datetime import datetime
+import os
+import sys
+
+# the shared quant_common package lives at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from data_loader import load_prices
 
 # Set page configuration
 st.set_page_config(
@@ -27,6 +32,11 @@ year_ago = curr_date.replace(year=curr_date.year - years)
 start_date = st.sidebar.date_input("Start Date", pd.to_datetime(year_ago))
 end_date = st.sidebar.date_input("End Date", pd.to_datetime(curr_date))
 
+# rolling windows (trading days); all of them are computed in one pass, the selector picks one to show
+windows = [20, 60, 120, 252]
+window = st.sidebar.selectbox("Rolling Window (days)", windows)
+alpha = st.sidebar.select_slider("VaR / CVaR Tail Probability", [0.01, 0.025, 0.05, 0.10], value=0.05)
+
 st.sidebar.markdown("""
     **Sector ETF Legend:**
     - `XLK`: Technology  
@@ -41,31 +51,29 @@ st.sidebar.markdown("""
 # @st.cache_data is used to cache the data for faster loading. it caches information like the dataframe, so it doesn't have to be reloaded every time the user interacts with the app.
 
 def get_data():
-    df =  yf.download(tickers, start=start_date, end=end_date, auto_adjust=True)
-    if isinstance(df.columns, pd.MultiIndex):
-        return df['Close']  # Auto-adjusted closing prices
-    else:
-        return df  # Already flattened structure
+    # prices come from the configured market data provider (yfinance unless MARKET_DATA_PROVIDER says otherwise);
+    # Yahoo Finance history is cached on disk, so reruns only download dates not seen before
+    return load_prices(tickers, start_date, end_date)  # Auto-adjusted closing prices
 
 # Adjusted Close is the closing price after adjusting for dividends and stock splits.
 # It gives the most accurate view of returns over time — essential for financial analysis and backtesting.
 
 prices = get_data()
-prices.to_csv('prices.csv')  # Save prices to CSV for reference
 
 from metrics import log_returns
 log_ret = log_returns(prices)
 
-from metrics import volatility
-vol = volatility(log_ret)
+from metrics import rolling_metrics
+risk = rolling_metrics(log_ret, windows, alpha=alpha)[window]
+vol = risk['volatility']
+sharpe = risk['sharpe']
 
-from metrics import sharpe_ratio
-sharpe = sharpe_ratio(log_ret)
-
-from metrics import drawdown
+from metrics import drawdown, drawdown_duration
 dd = drawdown(prices)
+dd_stats = drawdown_duration(prices)
 
-tabs = st.tabs(["📁 Data", "🔁 Log Returns", "📉 Volatility", "⚖️ Sharpe Ratio", "🧨 Drawdown", "🔗 Correlation"])
+tabs = st.tabs(["📁 Data", "🔁 Log Returns", "📉 Volatility", "⚖️ Sharpe Ratio", "🧨 Drawdown", "🛡️ Risk",
+                "🔗 Correlation"])
 
 with tabs[0]:
     st.subheader("📁 Data with Adjusted Closing Prices")
@@ -79,19 +87,46 @@ with tabs[1]:
     st.line_chart(log_ret, use_container_width=True)
 
 with tabs[2]:
-    st.subheader("📉 Volatility (20-day Rolling Standard Deviation)")
+    st.subheader(f"📉 Volatility ({window}-day Rolling Standard Deviation)")
     st.line_chart(vol, use_container_width=True)
 
 with tabs[3]:
-    st.subheader("⚖️ Sharpe Ratio (20-day Rolling)")
+    st.subheader(f"⚖️ Sharpe Ratio ({window}-day Rolling)")
     st.line_chart(sharpe, use_container_width=True)
 
 with tabs[4]:
     st.subheader("🧨 Drawdown (Peak to Trough)")
     st.line_chart(dd, use_container_width=True)
+    st.markdown("**Maximum drawdown and time under water (trading days since the last peak)**")
+    st.dataframe(dd_stats)
 
 with tabs[5]:
-    st.subheader("🔗 Correlation Matrix of Sectors")
-    fig, ax = plt.subplots()
-    sns.heatmap(prices.corr(), annot=True, cmap="coolwarm", ax=ax)
-    st.pyplot(fig)
\ No newline at end of file
+    st.subheader(f"🛡️ Risk ({window}-day Rolling)")
+    st.markdown(f"Daily Value at Risk and Conditional VaR at {alpha:.1%}, as losses in log-return terms.")
+    latest = risk.iloc[-1].unstack(level=0)
+    st.dataframe(latest[['sortino', 'var_parametric', 'cvar_parametric', 'var_historical', 'cvar_historical']])
+    st.markdown("**Sortino Ratio**")
+    st.line_chart(risk['sortino'], use_container_width=True)
+    st.markdown("**Historical CVaR**")
+    st.line_chart(risk['cvar_historical'], use_container_width=True)
+    st.markdown("**Correlation to the Equal-Weighted Sector Average**")
+    st.line_chart(risk['correlation'], use_container_width=True)
+
+with tabs[6]:
+    st.subheader(f"🔗 Correlation Matrix of Sector Returns ({window}-day Rolling)")
+    from covariance import rolling_covariance, average_correlation
+    ewma = st.checkbox("Exponential weighting (half-life of half the window)")
+    shrink = st.checkbox("Ledoit-Wolf shrinkage", disabled=ewma)
+    corr = rolling_covariance(log_ret, window, halflife=window / 2 if ewma else None, shrinkage=shrink and not ewma,
+                              correlation=True)
+    if len(log_ret) < window:
+        st.warning("Not enough data for the selected rolling window.")
+    else:
+        dates = log_ret.index[window - 1:]
+        as_of = st.select_slider("As of", options=list(dates), value=dates[-1], format_func=lambda d: d.strftime('%Y-%m-%d'))
+        fig, ax = plt.subplots()
+        sns.heatmap(pd.DataFrame(corr[log_ret.index.get_loc(as_of)], index=log_ret.columns, columns=log_ret.columns),
+                    annot=True, cmap="coolwarm", vmin=-1, vmax=1, ax=ax)
+        st.pyplot(fig)
+        st.markdown("**Average Pairwise Correlation**")
+        st.line_chart(pd.Series(average_correlation(corr), index=log_ret.index).dropna(), use_container_width=True)
\ No newline at end of file
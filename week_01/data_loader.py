@@ -0,0 +1,10 @@
+# Loads adjusted closing prices through the shared daily price providers
+# (yfinance by default; a CSV directory or a synthetic market for offline, deterministic runs)
+
+from quant_common.daily_prices import get_provider
+
+
+def load_prices(tickers, start, end, provider=None):
+    '''Adjusted closing prices for tickers between start and end, one column per ticker.'''
+    provider = get_provider() if provider is None else provider
+    return provider.get_prices(tickers, start, end)
@@ -1,5 +1,12 @@
 import numpy as np
+import pandas as pd
 import yfinance as yf
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.stats import norm
+
+# Columns of each window's frame in rolling_metrics
+METRICS = ['mean', 'volatility', 'sharpe', 'sortino', 'var_parametric', 'cvar_parametric',
+           'var_historical', 'cvar_historical', 'correlation']
 
 def log_returns(prices):
     '''Calculate log returns from prices. Log returns are preferred in finance as they are time-additive and can be used for continuous compounding.'''
@@ -7,16 +14,16 @@ def log_returns(prices):
     log_ret = np.log(prices / prices.shift(1)).dropna()
     return log_ret
 
-def volatility(log_ret):
+def volatility(log_ret, window=20):
     '''Calculate rolling volatility using a 20-day window and annualize it by multiplying by the square root of 252 (trading days in a year).'''
     '''higher volatility indicates higher risk, while lower volatility suggests more stable returns.'''
-    rolling_vol = log_ret.rolling(window = 20).std() * np.sqrt(252)
+    rolling_vol = rolling_metrics(log_ret, [window], historical=False)[window]['volatility']
     return rolling_vol
 
-def sharpe_ratio(log_ret):
+def sharpe_ratio(log_ret, window=20):
     '''Calculate the Sharpe Ratio using a 20-day rolling window. The Sharpe Ratio measures risk-adjusted return, indicating how much excess return is received for the extra volatility endured.'''
     '''A higher Sharpe Ratio indicates better risk-adjusted performance.'''
-    sharpe = (log_ret.rolling(window=20).mean() / log_ret.rolling(window=20).std()) * np.sqrt(252)
+    sharpe = rolling_metrics(log_ret, [window], historical=False)[window]['sharpe']
     return sharpe
 
 def drawdown(prices):
@@ -24,4 +31,111 @@ def drawdown(prices):
     '''A larger drawdown indicates a more significant risk of loss, while a smaller drawdown suggests a more stable investment.'''
     peak = prices.cummax()
     drawdown = (prices - peak) / peak
-    return drawdown
\ No newline at end of file
+    return drawdown
+
+def drawdown_duration(prices):
+    '''Maximum drawdown, and the longest and current time under water (days since the last peak), of each column.'''
+    '''A long time under water means capital stayed tied up in a loss, even when the drawdown itself was shallow.'''
+    p = prices.ffill().to_numpy(dtype=float)
+    peak = np.fmax.accumulate(p, axis=0)
+    days = np.arange(len(p))[:, None]
+    last_peak = np.maximum.accumulate(np.where(p < peak, 0, days), axis=0)
+    under_water = days - last_peak
+    return pd.DataFrame({'max_drawdown': np.nanmin(p / peak - 1, axis=0),
+                         'max_duration': under_water.max(axis=0),
+                         'current_duration': under_water[-1]}, index=prices.columns)
+
+def _cumulative(values):
+    # cumulative sum along the days with a leading zero row, so any window sum is one subtraction
+    return np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+
+def _window_sum(cumulative, window):
+    # trailing window sums ending at each day (NaN until the first full window)
+    total = np.full((cumulative.shape[0] - 1,) + cumulative.shape[1:], np.nan)
+    total[window - 1:] = cumulative[window:] - cumulative[:-window]
+    return total
+
+def _historical_tail(returns, window, alpha, max_elements=2**23):
+    # loss at the k-th worst return of each trailing window and the mean loss of the k worst, with
+    # k = ceil(alpha * window); windows are partitioned in blocks of assets to bound memory
+    k = max(1, int(np.ceil(alpha * window)))
+    var, cvar = np.full(returns.shape, np.nan), np.full(returns.shape, np.nan)
+    if len(returns) < window:
+        return var, cvar
+    by_asset = np.ascontiguousarray(returns.T)  # each window is then a contiguous run of days
+    windows = sliding_window_view(by_asset, window, axis=1)  # (assets, days - window + 1, window), no copy
+    columns = max(1, max_elements // (windows.shape[1] * window))
+    for start in range(0, len(windows), columns):
+        worst = np.partition(windows[start:start + columns], k - 1, axis=-1)[..., :k]
+        var[window - 1:, start:start + columns] = -worst[..., k - 1].T
+        cvar[window - 1:, start:start + columns] = -worst.mean(axis=-1).T
+    return var, cvar
+
+def rolling_metrics(log_ret, windows=(20,), alpha=0.05, reference=None, historical=True, periods_per_year=252):
+    '''
+    Rolling risk metrics of every column of log_ret, for several window lengths in one pass.
+
+    Running sums of the returns, their squares, their downside squares and their products with
+    a reference series are computed once; every window's mean, volatility, Sharpe, Sortino and
+    correlation is then a difference of two rows of those sums, so the cost per window does not
+    grow with its length. A window with a missing return gives NaN, as in pandas rolling.
+
+    - alpha: tail probability of the daily Value at Risk and Conditional VaR (expected shortfall),
+      reported as positive losses in log-return terms; the parametric ones assume normal returns,
+      the historical ones come from the worst ceil(alpha * window) returns of each window
+    - reference: return Series to correlate with (e.g. an index); the equal-weighted mean of the
+      columns if None
+    - historical: False skips the historical VaR/CVaR, the only metrics that need a sort per window
+
+    Returns a dictionary mapping each window to a DataFrame with (metric, ticker) columns,
+    metric being one of METRICS.
+    '''
+    r = log_ret.to_numpy(dtype=float)
+    valid = ~np.isnan(r)
+    # returns are centered before summing (variances are unchanged), which keeps the running sums small
+    center = np.nanmean(r, axis=0)
+    x = np.where(valid, r - center, 0.0)
+
+    reference = log_ret.mean(axis=1) if reference is None else reference.reindex(log_ret.index)
+    m = reference.to_numpy(dtype=float)[:, None]
+    joint = valid & ~np.isnan(m)
+    xj = np.where(joint, x, 0.0)
+    mj = np.where(joint, m - np.nanmean(m), 0.0)
+
+    sums = {name: _cumulative(values) for name, values in [
+        ('count', valid.astype(float)), ('x', x), ('xx', x * x), ('down', np.where(valid, np.minimum(r, 0) ** 2, 0.0)),
+        ('joint', joint.astype(float)), ('xj', xj), ('mj', mj), ('xxj', xj * xj), ('mmj', mj * mj), ('xmj', xj * mj)]}
+
+    z = norm.ppf(alpha)
+    annualize = np.sqrt(periods_per_year)
+    results = {}
+    for window in windows:
+        S = {name: _window_sum(total, window) for name, total in sums.items()}
+        full = S['count'] > window - 0.5
+
+        mean = S['x'] / window + center
+        std = np.sqrt(np.maximum(S['xx'] - S['x'] ** 2 / window, 0) / (window - 1))
+        std = np.where(std > 0, std, np.nan)
+        downside = np.sqrt(S['down'] / window)
+        downside = np.where(downside > 0, downside, np.nan)
+
+        cov = S['xmj'] - S['xj'] * S['mj'] / window
+        scale = np.sqrt(np.maximum(S['xxj'] - S['xj'] ** 2 / window, 0) * np.maximum(S['mmj'] - S['mj'] ** 2 / window, 0))
+        correlation = np.where(S['joint'] > window - 0.5, cov / np.where(scale > 0, scale, np.nan), np.nan)
+
+        values = {
+            'mean': mean,
+            'volatility': std * annualize,
+            'sharpe': mean / std * annualize,
+            'sortino': mean / downside * annualize,
+            'var_parametric': -(mean + z * std),
+            'cvar_parametric': -(mean - std * norm.pdf(z) / alpha),
+        }
+        if historical:
+            values['var_historical'], values['cvar_historical'] = _historical_tail(r, window, alpha)
+        values = {name: np.where(full, value, np.nan) for name, value in values.items()}
+        values['correlation'] = correlation  # masked on the days both series have returns
+
+        results[window] = pd.concat({name: pd.DataFrame(value, index=log_ret.index, columns=log_ret.columns)
+                                     for name, value in values.items()}, axis=1)
+    return results
@@ -0,0 +1,83 @@
+import time
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from utils.backtester import backtest_strategy
+
+# --- Reference: the original bar-by-bar loop (without the per-bar print) ---
+def backtest_strategy_loop(zscore_df, entry_threshold, exit_threshold):
+    position = 0
+    positions = [0]
+    pnl = []
+    equity = [100000]
+    df = zscore_df.copy()
+    df.dropna(subset=['Z-Score'], inplace=True)
+    for i in range(1, len(df)):
+        z = df['Z-Score'].iloc[i]
+        spread_change = df['Spread'].iloc[i] - df['Spread'].iloc[i - 1]
+        if position == 0:
+            if z > entry_threshold:
+                position = -1
+            elif z < -entry_threshold:
+                position = 1
+        elif position == 1 and z > exit_threshold:
+            position = 0
+        elif position == -1 and z < -exit_threshold:
+            position = 0
+        positions.append(position)
+        pnl.append(spread_change * position)
+        equity.append(equity[-1] + position * spread_change)
+    return {
+        'pnl': sum(pnl),
+        'equity_curve': pd.Series(equity, index=df.index),
+        'positions': pd.Series(positions, index=df.index)
+    }
+
+# --- Simulation Parameters ---
+num_bars = 1_000_000
+loop_bars = 50_000  # the loop gets a slice; it runs at roughly 10k bars per second
+window = 30
+entry_threshold = 1.0
+exit_threshold = 0.3
+
+# Mean-reverting spread (AR(1)) on minute bars, with its rolling z-score
+rng = np.random.default_rng(42)
+shocks = rng.normal(0, 0.05, num_bars)
+spread = pd.Series(lfilter([1.0], [1.0, -0.995], shocks), index=pd.date_range('2020-01-01', periods=num_bars, freq='min'))
+zscore_df = pd.DataFrame({
+    'Spread': spread,
+    'Z-Score': (spread - spread.rolling(window).mean()) / spread.rolling(window).std()
+})
+
+# --- Benchmark Vectorized Version ---
+print(f"Backtesting {num_bars:,} bars with the vectorized engine...")
+start_time_vec = time.time()
+result_vec = backtest_strategy(zscore_df, entry_threshold, exit_threshold)
+vec_duration = time.time() - start_time_vec
+trades = int((result_vec['positions'].diff().abs() > 0).sum())
+print(f"Vectorized version took: {vec_duration:.4f} seconds "
+      f"({num_bars / vec_duration:,.0f} bars per second, {trades:,} position changes)")
+
+print("-" * 30)
+
+# --- Benchmark Loop Version on a Slice ---
+print(f"Backtesting the first {loop_bars:,} bars with the original loop...")
+sample = zscore_df.iloc[:loop_bars]
+start_time_loop = time.time()
+result_loop = backtest_strategy_loop(sample, entry_threshold, exit_threshold)
+loop_duration = time.time() - start_time_loop
+print(f"Loop version took: {loop_duration:.4f} seconds ({loop_bars / loop_duration:,.0f} bars per second)")
+
+result_sample = backtest_strategy(sample, entry_threshold, exit_threshold)
+identical = (result_sample['positions'].equals(result_loop['positions'])
+             and result_sample['equity_curve'].equals(result_loop['equity_curve'])
+             and result_sample['pnl'] == result_loop['pnl'])
+print(f"Positions, equity curve and PnL identical to the loop: {identical}")
+
+print("-" * 30)
+
+# --- Calculate and Display the Speedup ---
+speedup = (num_bars / vec_duration) / (loop_bars / loop_duration)
+print(f"Vectorized version is {speedup:,.0f}x faster per bar than the loop "
+      f"(1M bars with the loop would take about {num_bars / loop_bars * loop_duration:,.0f} seconds).")
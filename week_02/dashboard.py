@@ -1,11 +1,17 @@
+import os
+import sys
+
 import numpy as np
 import pandas as pd
 import streamlit as st
 
+# the shared quant_common package lives at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from utils.data_loader import load_price_data
 from utils.indicator import calculate_zscore, plot_spread
 from utils.backtester import backtest_strategy
 from utils.ml_model import ml_predict_spread
+from utils.optimizer import grid_search
 
 st.set_page_config(page_title="StatArb Strategy Explorer", layout="wide")
 
@@ -22,6 +28,7 @@ window = st.slider("Rolling Window Size", min_value=10, max_value=120, value=30)
 
 entry_threshold = float(st.text_input("Entry Threshold", value="1.0"))
 exit_threshold = float(st.text_input("Exit Threshold", value="0.3"))
+sweep = st.checkbox("Also sweep window and thresholds (grid search)")
 
 if st.button("Run Analysis"):
     data = load_price_data(ticker1, ticker2, start_date, end_date)
@@ -36,5 +43,14 @@ if st.button("Run Analysis"):
     print(result["equity_curve"])
     st.line_chart(result['equity_curve'], use_container_width=True)
 
+    if sweep:
+        st.subheader("🔍 Parameter Sweep")
+        sweep_df = grid_search(data, range(10, 121, 10), np.arange(0.5, 3.01, 0.25), np.arange(0.0, 1.01, 0.1))
+        st.write(f"Top 20 of {len(sweep_df)} combinations, ranked by Sharpe ratio:")
+        st.dataframe(sweep_df.head(20), use_container_width=True)
+
     st.subheader("🧠 ML Prediction")
-    st.write(ml_predict_spread(zscore_df))
\ No newline at end of file
+    try:
+        st.write(ml_predict_spread(zscore_df, pair=(ticker1, ticker2), window=window))
+    except ValueError as e:
+        st.warning(str(e))
\ No newline at end of file
@@ -9,34 +9,60 @@
 import numpy as np
 import pandas as pd
 
+# Each bar moves the position through a transition map {-1, 0, 1} -> {-1, 0, 1} that depends only
+# on that bar's z-score. Positions are stored as 0, 1, 2 (= position + 1) and a map f is coded as
+# the integer f(0) + 3 f(1) + 9 f(2), so the 27 possible maps compose through a lookup table.
+_MAPS = np.array([[code % 3, code // 3 % 3, code // 9] for code in range(27)])
+_CODE_WEIGHTS = np.array([1, 3, 9])
+# _COMPOSE[g, f] is the code of "f, then g"
+_COMPOSE = np.array([[_MAPS[g][_MAPS[f]] @ _CODE_WEIGHTS for f in range(27)] for g in range(27)], dtype=np.int8)
+
+
+def position_path(zscore, entry_threshold, exit_threshold):
+    """
+    Positions after each bar of zscore, starting flat, without a Python loop.
+
+    Same rules as the bar-by-bar state machine: when flat, go short above entry_threshold and
+    long below -entry_threshold; close a long once z > exit_threshold and a short once
+    z < -exit_threshold, with no re-entry on the closing bar.
+
+    The position after bar i is the composition of the transition maps of bars 0..i applied
+    to the flat state, so all positions come from one prefix scan over the maps
+    (log2(n) passes of array lookups).
+    """
+    z = np.asarray(zscore, dtype=float)
+
+    # transition map of every bar: where it sends a short, a flat and a long position
+    from_short = np.where(z < -exit_threshold, 1, 0)
+    from_flat = np.select([z > entry_threshold, z < -entry_threshold], [0, 2], 1)
+    from_long = np.where(z > exit_threshold, 1, 2)
+    prefix = (from_short + 3 * from_flat + 9 * from_long).astype(np.int8)
+
+    # Hillis-Steele inclusive scan: after the pass with offset d, prefix[i] covers bars i-2d+1..i
+    offset = 1
+    while offset < len(prefix):
+        prefix[offset:] = _COMPOSE[prefix[offset:], prefix[:-offset]]
+        offset *= 2
+
+    return _MAPS[prefix, 1] - 1
+
+
 def backtest_strategy(zscore_df, entry_threshold, exit_threshold):
-    position = 0  # 1 for long, -1 for short, 0 for neutral
-    pnl = []  # List to store daily PnL
-    equity = [100000] # Starting equity of $100,000. Stores daily equity values
-    df = zscore_df.copy()  # Avoid modifying the original DataFrame
-    df.dropna(subset=['Z-Score'], inplace=True)
-    for i in range(1, len(df)):
-        z = df['Z-Score'].iloc[i]
-        prev_z = df['Z-Score'].iloc[i - 1]
-        spread_change = df['Spread'].iloc[i] - df['Spread'].iloc[i - 1]
-        # Check for entry/exit signals
-        if position == 0:  # No open position
-            if z > entry_threshold: # Short signal
-                position = -1
-            elif z < -entry_threshold:  # Long signal
-                position = 1
-        elif position == 1 and z > exit_threshold:
-            position = 0  # Close long position
-        elif position == -1 and z < -exit_threshold:
-            position = 0
-        
-        # Calculate PnL for the day
-        pnl.append(spread_change * position)
-        equity.append(equity[-1] + position * spread_change)
-        print(f"Day {i}: Z-Score = {z}, Spread Change = {spread_change}, Position = {position}, pnL = {pnl[-1]}, Equity = {equity[-1]}")
-        
+    df = zscore_df.dropna(subset=['Z-Score'])  # Avoid modifying the original DataFrame
+    z = df['Z-Score'].to_numpy()
+    spread = df['Spread'].to_numpy()
+
+    # 1 for long, -1 for short, 0 for neutral; trading starts on the second bar
+    position = np.zeros(len(df), dtype=int)
+    position[1:] = position_path(z[1:], entry_threshold, exit_threshold)
+
+    # Calculate PnL for each day, and equity from a starting $100,000
+    pnl = position[1:] * np.diff(spread)
+    equity = np.cumsum(np.concatenate([[100000.0], pnl]))  # running sums in bar order, like a loop
+
     results = {
-            'pnl': sum(pnl),  # Total PnL 
-            'equity_curve': pd.Series(equity, index=df.index)
+            'pnl': pnl.cumsum()[-1] if len(pnl) else 0,  # Total PnL
+            'equity_curve': pd.Series(equity, index=df.index),
+            'positions': pd.Series(position, index=df.index)
         }
-    return results
\ No newline at end of file
+    return results
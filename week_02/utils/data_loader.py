@@ -1,8 +1,11 @@
-# Loads price data for two tickers using yfinance
+# Loads price data for two tickers through the shared daily price providers
+# (yfinance by default; a CSV directory or a synthetic market for offline, deterministic runs)
 
-def load_price_data(ticker1, ticker2, start, end):
-    import pandas as pd
-    import yfinance as yf
-    data = yf.download([ticker1, ticker2], start=start, end=end, auto_adjust=True)['Close']
+from quant_common.daily_prices import get_provider
+
+
+def load_price_data(ticker1, ticker2, start, end, provider=None):
+    provider = get_provider() if provider is None else provider
+    data = provider.get_prices([ticker1, ticker2], start, end)
     # data.to_csv('data/price_data.csv')  # Save to CSV for future use
-    return data.dropna()
\ No newline at end of file
+    return data.dropna()
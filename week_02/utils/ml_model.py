@@ -1,20 +1,159 @@
-from sklearn.ensemble import RandomForestClassifier
+# Walk-forward prediction of the spread's next move
+# Features are built in one vectorized pass, the forest is refitted on a rolling window every few bars
+# (warm start: new trees for the new window, the oldest trees retired), and the fitted state is cached
+# on disk per pair, z-score window and configuration, so a rerun only walks forward over the bars it has
+# not seen. The state is only resumed if the bars it was trained on are unchanged.
+
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
 import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from quant_common.price_cache import CACHE_DIR_ENV_VAR, DEFAULT_CACHE_DIR
+
+# Feature and walk-forward settings; every entry is part of the model cache key
+DEFAULT_CONFIG = {
+    'lags': [1, 2, 3, 5],  # lagged spread changes and z-scores
+    'windows': [5, 20],  # rolling mean and volatility of spread changes
+    'train_window': 250,  # bars in each training window
+    'step': 20,  # bars predicted between refits
+    'initial_trees': 100,
+    'trees_per_step': 10,
+    'max_trees': 300,
+    'max_depth': 6,
+}
+
+
+def build_features(zscore_df, config=DEFAULT_CONFIG):
+    """
+    Feature matrix and target (1 if the spread rises over the next bar) from a z-score frame
+    with 'Spread' and 'Z-Score' columns. The caller's DataFrame is left untouched; rows
+    without a full feature history are dropped, the last row keeps a NaN target.
+    """
+    spread = zscore_df['Spread']
+    change = spread.diff()
+    z = zscore_df['Z-Score']
+
+    columns = {'ZScore': z, 'Change': change}
+    for lag in config['lags']:
+        columns[f'Change_Lag{lag}'] = change.shift(lag)
+        columns[f'ZScore_Lag{lag}'] = z.shift(lag)
+    for window in config['windows']:
+        columns[f'Change_Mean{window}'] = change.rolling(window).mean()
+        columns[f'Change_Vol{window}'] = change.rolling(window).std()
+        columns[f'Momentum{window}'] = spread - spread.shift(window)
+    features = pd.DataFrame(columns, index=zscore_df.index).dropna()
+
+    next_change = spread.shift(-1) - spread
+    target = (next_change > 0).astype(float).where(next_change.notna()).reindex(features.index)
+    return features, target
+
+
+def _cache_path(pair, window, config):
+    key = json.dumps({'pair': list(pair), 'window': window, 'config': config}, sort_keys=True)
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    directory = os.path.join(os.environ.get(CACHE_DIR_ENV_VAR, DEFAULT_CACHE_DIR), 'models')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{'_'.join(pair)}_{digest}.joblib")
 
-def ml_predict_spread(zscore_df):
-    zscore_df['Lag1'] = zscore_df['Spread'].shift(1)
-    zscore_df['Target'] = (zscore_df['Spread'].shift(-1) > zscore_df['Spread']).astype(int)
-    zscore_df.dropna(inplace=True)
 
-    X = zscore_df[['Lag1']]
-    y = zscore_df['Target']
+def _fingerprint(features, target, last_refit):
+    # hash of every row the state has learned from: features up to the last refit bar, and the
+    # targets before it (the target at that bar needs the next bar, which may since have arrived)
+    end = features.index.get_loc(last_refit)
+    rows = features.iloc[:end + 1].assign(Target=target.iloc[:end + 1].where(features.index[:end + 1] != last_refit))
+    return hashlib.sha256(pd.util.hash_pandas_object(rows).to_numpy().tobytes()).hexdigest()
 
-    model = RandomForestClassifier(n_estimators=100)
+
+def _refit(model, X, y, config):
+    # warm start: grow the forest by trees fitted on the current window, retire the oldest ones
+    if hasattr(model, 'estimators_'):
+        model.n_estimators = len(model.estimators_) + config['trees_per_step']
     model.fit(X, y)
-    pred = model.predict(X.tail(1))
-    prob = model.predict_proba(X.tail(1))
+    if len(model.estimators_) > config['max_trees']:
+        model.estimators_ = model.estimators_[-config['max_trees']:]
+        model.n_estimators = len(model.estimators_)
+
+
+def walk_forward(features, target, config=DEFAULT_CONFIG, state=None):
+    """
+    Rolling walk-forward training: at every step-th bar t the model is refitted on the
+    train_window labelled bars before t, then predicts bars t..t+step-1, which it has not seen.
+
+    state is a previous return value for the same pair and config; if its last refit bar is
+    still in features and every row up to it is unchanged (first bar, prices, hedge ratio and
+    z-score window all feed the features), training resumes from there instead of starting
+    over; otherwise the state and its predictions are discarded. Returns the new state:
+    'model', 'last_refit' (index label of the last refit bar), 'fingerprint' (hash of the rows
+    up to it) and 'predictions' (out-of-sample probability of a rise, per bar).
+    """
+    X, y = features.to_numpy(), target.to_numpy()
+    n_labelled = int(target.notna().sum())  # only the last bar has no target
+    train_window, step = config['train_window'], config['step']
+
+    if (state is not None and state['last_refit'] in features.index
+            and state.get('fingerprint') == _fingerprint(features, target, state['last_refit'])):
+        # the model already includes the refit at this bar; carry on predicting after it
+        model, predictions = state['model'], state['predictions']
+        refit_points = range(features.index.get_loc(state['last_refit']), n_labelled + 1, step)
+        resumed = True
+    else:
+        model = RandomForestClassifier(n_estimators=config['initial_trees'], max_depth=config['max_depth'],
+                                       warm_start=True, n_jobs=-1, random_state=0)
+        predictions = pd.Series(dtype=float)
+        refit_points = range(train_window, n_labelled + 1, step)
+        resumed = False
+
+    new_predictions = []
+    last_refit = state['last_refit'] if resumed else None
+    for t in refit_points:
+        window = slice(t - train_window, t)
+        if not (resumed and t == refit_points[0]) and len(np.unique(y[window])) == 2:
+            _refit(model, X[window], y[window], config)
+        if hasattr(model, 'estimators_') and t < len(X):
+            block = slice(t, min(t + step, len(X)))
+            new_predictions.append(pd.Series(model.predict_proba(X[block])[:, 1], index=features.index[block]))
+            last_refit = features.index[t]
+
+    if new_predictions:
+        predictions = pd.concat([predictions] + new_predictions)
+        predictions = predictions[~predictions.index.duplicated(keep='last')].sort_index()
+    fingerprint = _fingerprint(features, target, last_refit) if last_refit is not None else None
+    return {'model': model, 'last_refit': last_refit, 'fingerprint': fingerprint, 'predictions': predictions}
+
+
+def ml_predict_spread(zscore_df, pair=('spread',), config=DEFAULT_CONFIG, window=None):
+    """
+    Predicts the direction of the spread's next move with a walk-forward random forest.
+
+    The fitted state is cached on disk per pair, z-score window (the window_size zscore_df was
+    computed with) and config, so after the first run only the new bars are walked forward. Returns the prediction for the bar after the last one, its
+    confidence, and the out-of-sample hit rate of the walk-forward predictions. Raises
+    ValueError if there are too few bars, or if no training window holds both a rise and a fall.
+    """
+    features, target = build_features(zscore_df, config)
+    if len(features) <= config['train_window']:
+        raise ValueError(f"Need more than {config['train_window']} bars of features for the walk-forward model.")
+
+    path = _cache_path(pair, window, config)
+    state = joblib.load(path) if os.path.exists(path) else None
+    state = walk_forward(features, target, config, state)
+    if not hasattr(state['model'], 'estimators_'):
+        # every training window held a single class (the spread only rose or only fell)
+        raise ValueError("The spread's next move never changes direction within a training window; "
+                         "the walk-forward model cannot be fitted.")
+    joblib.dump(state, path)
+
+    prob = state['model'].predict_proba(features.tail(1).to_numpy())[0]
+    scored = state['predictions'].index.intersection(target.dropna().index)
+    hits = (state['predictions'][scored] > 0.5) == (target[scored] == 1)
 
     return {
-        "Prediction": "Long" if pred[0] == 1 else "Short",
-        "Confidence": round(prob[0].max(),2)
+        "Prediction": "Long" if prob[1] > 0.5 else "Short",
+        "Confidence": round(float(prob.max()), 2),
+        "Walk-Forward Accuracy": round(float(hits.mean()), 3) if len(hits) else None
     }
@@ -0,0 +1,58 @@
+# Parameter sweep over rolling window, entry and exit thresholds
+# The shared sweep engine groups the combinations by window; this module backtests one window's
+# group: its z-score is computed once and shared by every (entry, exit) pair tried with it.
+
+import numpy as np
+
+from quant_common.sweep import grid_params, performance, random_params, run_window_sweep, unscored_rows
+
+from .indicator import calculate_zscore
+from .backtester import position_path
+
+
+def _evaluate_window(task):
+    # one process-pool task: every threshold pair for one window, sharing its z-score and spread changes
+    data, window, thresholds, periods_per_year = task
+    zscore_df = calculate_zscore(data, window_size=window).dropna(subset=['Z-Score'])
+    z = zscore_df['Z-Score'].to_numpy()
+    spread_change = np.diff(zscore_df['Spread'].to_numpy())
+    if len(z) < 2:  # window longer than the data
+        return unscored_rows(window, thresholds)
+
+    # same bookkeeping as backtest_strategy, on arrays
+    rows = []
+    position = np.zeros(len(z), dtype=int)
+    for entry_threshold, exit_threshold in thresholds:
+        position[1:] = position_path(z[1:], entry_threshold, exit_threshold)
+        equity = np.cumsum(np.concatenate([[100000.0], position[1:] * spread_change]))
+        rows.append((window, entry_threshold, exit_threshold, *performance(equity, position, periods_per_year)))
+    return rows
+
+
+def run_sweep(data, params, max_workers=None, periods_per_year=252):
+    """
+    Backtests every (window, entry_threshold, exit_threshold) in params on price data
+    (two columns, as returned by load_price_data).
+
+    Parameters are grouped by window, so each z-score is computed once; the groups run in a
+    process pool of max_workers processes (None uses every core, 1 runs in this process).
+
+    Returns a DataFrame with one row per combination, ranked by Sharpe ratio.
+    """
+    return run_window_sweep(_evaluate_window, params,
+                            lambda window, thresholds: (data, window, thresholds, periods_per_year), max_workers)
+
+
+def grid_search(data, windows, entry_thresholds, exit_thresholds, max_workers=None, periods_per_year=252):
+    """Backtests every combination of the given windows, entry and exit thresholds (see run_sweep)."""
+    return run_sweep(data, grid_params(windows, entry_thresholds, exit_thresholds), max_workers, periods_per_year)
+
+
+def random_search(data, n_samples, window_range=(10, 120), entry_range=(0.5, 3.0), exit_range=(0.0, 1.0),
+                  seed=None, max_workers=None, periods_per_year=252):
+    """
+    Backtests n_samples random combinations (see run_sweep): windows drawn as integers from
+    window_range (inclusive), thresholds uniformly from entry_range and exit_range.
+    """
+    params = random_params(n_samples, window_range, entry_range, exit_range, seed)
+    return run_sweep(data, params, max_workers, periods_per_year)
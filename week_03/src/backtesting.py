@@ -1,15 +1,99 @@
 # Backtesting and calculating performance metrics for the strategy
 import numpy as np
+import pandas as pd
 
-def backtest_strategy(signal_df, hedge_ratio, initial_capital):
+def execution_model(position, price1, price2, hedge_ratio, initial_capital, commission=0.0, slippage_bps=0.0,
+                    borrow_rate=0.0, sizing="proportional", lot_size=100, periods_per_year=252):
+    """
+    Net returns, trading costs and portfolio value of a pair position path, in whole-array operations.
+
+    Parameters:
+    - position: Position after each bar (1 long Y / short X, -1 short Y / long X, 0 flat)
+    - price1, price2: Closing prices of Y and X
+    - hedge_ratio: Scalar, or per-bar array of the hedge ratio known at each bar
+    - initial_capital: Starting capital
+    - commission: Fixed cost per order; opening or closing a position is one order per leg
+    - slippage_bps: Cost in basis points of the notional traded
+    - borrow_rate: Annual cost of the short leg's notional, charged per bar held
+    - sizing: "proportional" (positions are a fraction of current capital: one unit of capital
+      in Y against hedge_ratio units in X, so returns compound) or "fixed_lot" (lot_size
+      shares of Y against round(hedge_ratio * lot_size) shares of X, so PnL adds up in money)
+    - lot_size: Shares of Y per position in fixed-lot sizing
+    - periods_per_year: Bars per year, to charge borrow per bar
+
+    Returns:
+    - Dictionary of per-bar arrays: 'Strategy_return' (net of all costs; compounding it from
+      initial_capital gives portfolio_value), 'Costs' (in money) and 'portfolio_value'
+    """
+    position = np.asarray(position, dtype=float)
+    y = np.asarray(price1, dtype=float)
+    x = np.asarray(price2, dtype=float)
+    hedge = np.broadcast_to(np.asarray(hedge_ratio, dtype=float), y.shape)
+
+    # the position held over each bar was set at the previous close, with the ratio known then
+    held = np.concatenate([[0.0], position[:-1]])
+    held_hedge = np.concatenate([hedge[:1], hedge[:-1]])
+    traded = np.abs(np.diff(position, prepend=0.0))  # position change at each bar's close
+    commissions = commission * 2 * (traded > 0)
+    borrow_per_bar = borrow_rate / periods_per_year
+
+    if sizing == "proportional":
+        ret_y = np.diff(np.log(y), prepend=np.log(y[0]))
+        ret_x = np.diff(np.log(x), prepend=np.log(x[0]))
+        gross = held * (ret_y - held_hedge * ret_x)
+        # fractions of capital: notional traded in both legs, and short exposure while held
+        slippage = traded * (1 + np.abs(hedge)) * slippage_bps / 1e4
+        short = np.maximum(-held, 0) + np.maximum(held * held_hedge, 0)
+        rate = gross - slippage - short * borrow_per_bar  # return net of the costs charged in proportion
+
+        # value_t = value_{t-1} * (1 + rate_t) - commission_t, solved in closed form
+        growth = np.cumprod(1 + rate)
+        portfolio_value = growth * (initial_capital - np.cumsum(commissions / growth))
+        previous_value = np.concatenate([[initial_capital], portfolio_value[:-1]])
+        costs = previous_value * (gross - rate) + commissions
+        # net of the fixed commissions too, so compounding the returns gives portfolio_value
+        net = portfolio_value / previous_value - 1
+    elif sizing == "fixed_lot":
+        shares_x = np.round(hedge * lot_size)
+        held_shares_x = np.concatenate([shares_x[:1], shares_x[:-1]])
+        prev_y = np.concatenate([y[:1], y[:-1]])
+        prev_x = np.concatenate([x[:1], x[:-1]])
+
+        gross_pnl = held * (lot_size * (y - prev_y) - held_shares_x * (x - prev_x))
+        slippage = traded * (lot_size * y + np.abs(shares_x) * x) * slippage_bps / 1e4
+        short_notional = np.maximum(-held, 0) * lot_size * prev_y + np.maximum(held * held_shares_x, 0) * prev_x
+        costs = commissions + slippage + short_notional * borrow_per_bar
+
+        portfolio_value = initial_capital + np.cumsum(gross_pnl - costs)
+        previous_value = np.concatenate([[initial_capital], portfolio_value[:-1]])
+        net = portfolio_value / previous_value - 1
+    else:
+        raise ValueError("Invalid sizing. Use 'proportional' or 'fixed_lot'.")
+
+    return {'Strategy_return': net, 'Costs': costs, 'portfolio_value': portfolio_value}
+
+def backtest_strategy(signal_df, hedge_ratio, initial_capital, commission=0.0, slippage_bps=0.0, borrow_rate=0.0,
+                      sizing="proportional", lot_size=100, periods_per_year=252):
+    """
+    Backtests a signal_gen output. hedge_ratio is a float or a per-bar Series (e.g. from a rolling
+    or Kalman zscore_calc); the cost and sizing arguments are described in execution_model.
+    """
     df = signal_df.copy()
+    if isinstance(hedge_ratio, pd.Series):
+        # time-varying hedge ratio: a position held over a bar uses the ratio known when it was set
+        hedge_ratio = hedge_ratio.reindex(df.index).to_numpy()
     df["Ret_Y"] = np.log(df["Close_data1"] / df["Close_data1"].shift(1))
     df["Ret_X"] = np.log(df["Close_data2"] / df["Close_data2"].shift(1))
 
-    df["Strategy_return"] = df["Position"].shift(1) * (df["Ret_Y"] - hedge_ratio * df["Ret_X"])
+    result = execution_model(df["Position"].to_numpy(), df["Close_data1"].to_numpy(), df["Close_data2"].to_numpy(),
+                             hedge_ratio, initial_capital, commission=commission, slippage_bps=slippage_bps,
+                             borrow_rate=borrow_rate, sizing=sizing, lot_size=lot_size,
+                             periods_per_year=periods_per_year)
+    df["Strategy_return"] = result["Strategy_return"]
+    df["Costs"] = result["Costs"]
     # Capital growth
-    df['cumulative_return'] = (1 + df['Strategy_return']).cumprod()
-    df['portfolio_value'] = initial_capital * df['cumulative_return']
+    df['portfolio_value'] = result["portfolio_value"]
+    df['cumulative_return'] = df['portfolio_value'] / initial_capital
     df['pnl'] = df['portfolio_value'] - initial_capital
 
-    return df
\ No newline at end of file
+    return df
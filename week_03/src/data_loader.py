@@ -1,22 +1,160 @@
+import os
+
 import numpy as np
 import pandas as pd
-import yfinance as yf
+from scipy.signal import lfilter
+
+from quant_common.price_cache import PriceCache
+from quant_common.providers import SeededSource, select_provider
+
+# Regular trading sessions (local open, local close, time zone)
+SESSIONS = {
+    'NSE': ('09:15', '15:30', 'Asia/Kolkata'),
+    'US': ('09:30', '16:00', 'America/New_York'),
+}
+
+
+def market_of(ticker):
+    """'NSE' for National Stock Exchange tickers (suffix .NS), 'US' otherwise."""
+    return 'NSE' if ticker.endswith('.NS') else 'US'
+
+
+class BarProvider:
+    """Interface for intraday OHLCV bars."""
+
+    def get_bars(self, ticker, start_date, end_date, timeframe):
+        """
+        Bars for ticker between start_date and end_date at timeframe (e.g. '1m', '5m', '15m').
+
+        Returns a DataFrame with 'Open', 'High', 'Low', 'Close' and 'Volume' columns, indexed by
+        bar timestamp (naive timestamps are taken to be UTC).
+        """
+        raise NotImplementedError
 
-def fetch_intraday_data(ticker, start_date, end_date, timeframe):
+
+class YFinanceProvider(BarProvider):
+    """Live data from Yahoo Finance."""
+
+    def get_bars(self, ticker, start_date, end_date, timeframe):
+        import yfinance as yf
+        return yf.download(ticker, start=start_date, end=end_date, interval=timeframe)
+
+
+class CSVProvider(BarProvider):
     """
-    Fetch intraday data for a given ticker and date range.
-    
-    Parameters:
-    - ticker: Stock ticker symbol (e.g., 'AAPL', 'TCS.NS')
-    - start_date: Start date for the data fetch
-    - end_date: End date for the data fetch
-    - timeframe: Timeframe for intraday data (e.g., '1m', '5m', '15m')
-    
-    Returns:
-    - DataFrame with intraday data
+    Bars from a directory of <TICKER>_<timeframe>.csv files (dots in the ticker replaced by
+    underscores), each with a timestamp column first and OHLCV columns.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def get_bars(self, ticker, start_date, end_date, timeframe):
+        path = os.path.join(self.directory, '{}_{}.csv'.format(ticker.replace('.', '_'), timeframe))
+        data = pd.read_csv(path, index_col=0)
+        data.index = pd.to_datetime(data.index, utc=True)
+        start = pd.Timestamp(start_date).tz_localize(SESSIONS[market_of(ticker)][2])
+        end = pd.Timestamp(end_date).tz_localize(SESSIONS[market_of(ticker)][2])
+        return data.loc[(data.index >= start) & (data.index < end)]
+
+
+class CachedProvider(BarProvider):
+    """
+    Wraps another provider with the on-disk PriceCache, so bars are downloaded once per
+    (ticker, timeframe) and later requests only fetch the dates not seen before.
+    """
+
+    def __init__(self, provider, cache=None):
+        self.provider = provider
+        self.cache = PriceCache() if cache is None else cache
+
+    def get_bars(self, ticker, start_date, end_date, timeframe):
+        def fetch(span_start, span_end):
+            data = self.provider.get_bars(ticker, span_start, span_end, timeframe)
+            if isinstance(data.columns, pd.MultiIndex):
+                data.columns = [col[0] for col in data.columns]
+            return to_exchange_time(data, ticker)
+        return self.cache.get(ticker, timeframe, start_date, end_date, fetch)
+
+
+class SyntheticProvider(BarProvider, SeededSource):
+    """
+    Deterministic synthetic intraday market for offline runs and benchmarks.
+
+    Bars cover each weekday's regular session from BASE_DATE on. Log prices are a common market
+    factor plus a per-ticker mean-reverting component, so any two tickers of the same market form a
+    cointegrated pair. The market factor opens each day at the level of a daily random walk over
+    the business days since BASE_DATE, and each day's bars are seeded on their own from (seed,
+    ticker, date), so the same bar comes back whatever range is asked for.
     """
-    # Fetch data using yfinance
-    data = yf.download(ticker, start=start_date, end=end_date, interval=timeframe)
+
+    BASE_DATE = '2000-01-03'
+
+    def __init__(self, seed=0, daily_vol=0.015, idio_vol=0.004, half_life_bars=60):
+        self.seed = seed
+        self.daily_vol = daily_vol
+        self.idio_vol = idio_vol
+        self.half_life_bars = half_life_bars
+
+    def get_bars(self, ticker, start_date, end_date, timeframe):
+        open_time, close_time, tz = SESSIONS[market_of(ticker)]
+        minutes = int(timeframe.rstrip('m'))
+        rng = self._rng(ticker)
+        price0, beta = rng.uniform(50, 3000), rng.uniform(0.6, 1.4)
+        phi = 0.5 ** (1 / self.half_life_bars)
+
+        days = pd.bdate_range(start_date, pd.Timestamp(end_date) - pd.Timedelta(days=1))
+        if len(days) and days[0] < pd.Timestamp(self.BASE_DATE):
+            raise ValueError(f"Synthetic bars start on {self.BASE_DATE}.")
+        # market level at each day's open: one random walk over every business day since BASE_DATE
+        calendar = pd.bdate_range(self.BASE_DATE, days[-1]) if len(days) else pd.DatetimeIndex([])
+        opens = pd.Series(np.cumsum(self._rng('market', 'daily').normal(0, self.daily_vol, len(calendar))),
+                          index=calendar)
+
+        frames = []
+        for day in days:
+            index = pd.date_range(pd.Timestamp(f'{day.date()} {open_time}', tz=tz),
+                                  pd.Timestamp(f'{day.date()} {close_time}', tz=tz),
+                                  freq=f'{minutes}min', inclusive='left')
+            n = len(index)
+            bar_vol = self.daily_vol * np.sqrt(minutes / 390)
+
+            # market factor shared by every ticker of the market, plus this ticker's OU component
+            day_key = day.strftime('%Y-%m-%d')
+            market = opens[day] + np.cumsum(self._rng('market', day_key, minutes).normal(0, bar_vol, n))
+            shocks = self._rng(ticker, day_key, minutes).normal(0, self.idio_vol * np.sqrt(minutes / 390), n)
+            idio = lfilter([1.0], [1.0, -phi], shocks)  # AR(1): idio[i] = phi * idio[i-1] + shocks[i]
+
+            close = price0 * np.exp(beta * market + idio)
+            open_ = np.concatenate([[close[0]], close[:-1]])
+            spread = np.abs(self._rng(ticker, day_key, 'range').normal(0, bar_vol / 2, n))
+            frames.append(pd.DataFrame({
+                'Open': open_,
+                'High': np.maximum(open_, close) * (1 + spread),
+                'Low': np.minimum(open_, close) * (1 - spread),
+                'Close': close,
+                'Volume': self._rng(ticker, day_key, 'volume').integers(1_000, 100_000, n),
+            }, index=index))
+
+        if not frames:
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        return pd.concat(frames)
+
+
+def get_provider(name=None):
+    """
+    Returns the bar provider called name: 'yfinance', 'synthetic' or 'csv:<directory>'.
+    Yahoo Finance downloads go through the on-disk PriceCache.
+
+    Defaults to the MARKET_DATA_PROVIDER environment variable, then to 'yfinance'.
+    """
+    return select_provider(name, {'yfinance': lambda: CachedProvider(YFinanceProvider()),
+                                  'synthetic': SyntheticProvider,
+                                  'csv': CSVProvider})
+
+
+def to_exchange_time(data, ticker):
+    """Converts the bar index to the ticker's exchange time zone (naive timestamps are taken to be UTC)."""
     # Ensure the index is a datetime index
     data.index = pd.to_datetime(data.index)
     
@@ -29,6 +167,27 @@ def fetch_intraday_data(ticker, start_date, end_date, timeframe):
     else:
         # Convert to US Eastern time zone for other markets
         data.index = data.index.tz_convert('America/New_York')
+    return data
+
+
+def fetch_intraday_data(ticker, start_date, end_date, timeframe, provider=None):
+    """
+    Fetch intraday data for a given ticker and date range.
+    
+    Parameters:
+    - ticker: Stock ticker symbol (e.g., 'AAPL', 'TCS.NS')
+    - start_date: Start date for the data fetch
+    - end_date: End date for the data fetch
+    - timeframe: Timeframe for intraday data (e.g., '1m', '5m', '15m')
+    - provider: BarProvider to fetch from (defaults to get_provider())
+    
+    Returns:
+    - DataFrame with intraday data
+    """
+    # Fetch data from the configured provider (yfinance unless MARKET_DATA_PROVIDER says otherwise)
+    provider = get_provider() if provider is None else provider
+    data = provider.get_bars(ticker, start_date, end_date, timeframe)
+    data = to_exchange_time(data, ticker)
     
     # # Clean ticker (avoid invalid filename characters)
     # clean_ticker = ticker.replace(".", "_")
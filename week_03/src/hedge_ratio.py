@@ -0,0 +1,87 @@
+# Time-varying hedge ratios: rolling-window OLS and a Kalman filter
+# Both estimate Y = hedge_ratio * X + intercept using only bars up to the current one, so the
+# spread carries no look-ahead from a full-sample fit.
+
+import numpy as np
+
+
+def rolling_ols(y, x, window):
+    """
+    Rolling-window OLS of y on x with an intercept, O(1) per bar from running sums.
+
+    Parameters:
+    - y, x: Price arrays of equal length
+    - window: Number of bars in each regression
+
+    Returns:
+    - (hedge_ratio, intercept, spread) arrays; entry t uses bars t-window+1..t, and the first
+      window-1 entries are NaN
+    """
+    y = np.asarray(y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    # measuring from the first bar keeps the running sums small, so differences of them stay accurate
+    y0, x0 = y[0], x[0]
+    ys, xs = y - y0, x - x0
+
+    def window_sum(a):
+        total = np.concatenate([[0.0], np.cumsum(a)])
+        out = np.full(len(a), np.nan)
+        out[window - 1:] = total[window:] - total[:-window]
+        return out
+
+    sx, sy = window_sum(xs), window_sum(ys)
+    sxx, sxy = window_sum(xs * xs), window_sum(xs * ys)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hedge_ratio = (sxy - sx * sy / window) / (sxx - sx * sx / window)
+    intercept = y0 + (sy - hedge_ratio * sx) / window - hedge_ratio * x0
+    spread = y - (hedge_ratio * x + intercept)
+    return hedge_ratio, intercept, spread
+
+
+def kalman_hedge_ratio(y, x, delta=1e-4, obs_var=1e-3):
+    """
+    Dynamic hedge ratio from a Kalman filter on the state (hedge_ratio, intercept), modelled as a
+    random walk observed through y_t = hedge_ratio_t * x_t + intercept_t + noise.
+
+    Parameters:
+    - y, x: Price arrays of equal length
+    - delta: State noise, as the fraction delta / (1 - delta) of variance added per bar;
+      larger values let the hedge ratio move faster
+    - obs_var: Variance of the observation noise, in squared units of y; smaller values make
+      the filter follow each bar more closely
+
+    Returns:
+    - (hedge_ratio, intercept, spread) arrays; entry t holds the estimates from bars before t
+      and the spread is the filter's innovation y_t - (hedge_ratio_t * x_t + intercept_t), the
+      error of its one-step prediction. The first entry has no estimate and is NaN
+    """
+    y = np.asarray(y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    n = len(y)
+    q = delta / (1 - delta)
+
+    hedge_ratio, intercept = np.empty(n), np.empty(n)
+    beta = alpha = 0.0
+    # state covariance [[p_bb, p_ba], [p_ba, p_aa]], starting diffuse (zero mean, large variance) so
+    # the first bars set the state instead of the arbitrary zero guess
+    p_bb, p_ba, p_aa = 1e3, 0.0, 1e3
+    for t in range(n):
+        xt = x[t]
+        hedge_ratio[t], intercept[t] = beta, alpha
+        # predict: random walk adds q to the variances
+        r_bb, r_ba, r_aa = p_bb + q, p_ba, p_aa + q
+
+        # update with the observation y_t = [x_t, 1] . state
+        rh_b = r_bb * xt + r_ba  # R H'
+        rh_a = r_ba * xt + r_aa
+        s = xt * rh_b + rh_a + obs_var
+        k_b, k_a = rh_b / s, rh_a / s
+        error = y[t] - (beta * xt + alpha)
+        beta += k_b * error
+        alpha += k_a * error
+        p_bb, p_ba, p_aa = r_bb - k_b * rh_b, r_ba - k_b * rh_a, r_aa - k_a * rh_a
+
+    hedge_ratio[:1] = intercept[:1] = np.nan
+    spread = y - (hedge_ratio * x + intercept)
+    return hedge_ratio, intercept, spread
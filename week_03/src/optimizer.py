@@ -0,0 +1,88 @@
+# Parameter sweep over rolling window, entry and exit thresholds
+# The shared sweep engine groups the combinations by window; this module backtests one window's
+# group. The hedge ratio is fitted with the strategy's own method (once, unless its lookback scales
+# with the window) and the z-score for each window is shared by every (entry, exit) pair tried with it.
+
+import numpy as np
+
+from quant_common.sweep import grid_params, performance, random_params, run_window_sweep, unscored_rows
+
+from .zscore import zscore_calc
+from .signal_gen import latch_positions
+from .backtesting import execution_model
+
+
+def _evaluate_window(task):
+    # one process-pool task: every threshold pair for one window, sharing its z-score
+    spread_df, window, thresholds, initial_capital, periods_per_year, costs = task
+    spread = spread_df['Spread']
+    df = spread_df.assign(ZScore=(spread - spread.rolling(window=window).mean()) / spread.rolling(window=window).std())
+    df = df.dropna(subset=['ZScore'])
+    if len(df) < 2:  # window longer than the data
+        return unscored_rows(window, thresholds)
+
+    z = df['ZScore'].to_numpy()
+    price1, price2 = df['Close_data1'].to_numpy(), df['Close_data2'].to_numpy()
+    hedge_ratio = df['HedgeRatio'].to_numpy()
+
+    # same bookkeeping as signal_gen followed by backtest_strategy, on arrays
+    rows = []
+    for entry_threshold, exit_threshold in thresholds:
+        _, position = latch_positions(z, entry_threshold, exit_threshold)
+        equity = execution_model(position, price1, price2, hedge_ratio, initial_capital,
+                                 periods_per_year=periods_per_year, **costs)['portfolio_value']
+        rows.append((window, entry_threshold, exit_threshold,
+                     *performance(np.concatenate([[initial_capital], equity]), position, periods_per_year)))
+    return rows
+
+
+def _spread_frame(data1, data2, window, hedge):
+    # prices, hedge ratio and spread per bar, as zscore_calc builds them for the strategy
+    base_df, _, _ = zscore_calc(data1, data2, window_size=window, **hedge)
+    return base_df[['Close_data1', 'Close_data2', 'HedgeRatio', 'Spread']]
+
+
+def run_sweep(data1, data2, params, initial_capital=100000, max_workers=None, periods_per_year=252, costs=None,
+              hedge=None):
+    """
+    Backtests every (window, entry_threshold, exit_threshold) in params on a pair of bar
+    DataFrames (as returned by fetch_intraday_data).
+
+    Parameters are grouped by window so each z-score is computed once; the groups run in a
+    process pool of max_workers processes (None uses every core, 1 runs in this process).
+    periods_per_year is the number of bars per year, used to annualize the Sharpe ratio. costs
+    holds execution_model's cost and sizing arguments (commission, slippage_bps, borrow_rate,
+    sizing, lot_size), and hedge zscore_calc's hedge ratio arguments (method, hedge_window,
+    kalman_delta, ...), so every combination is backtested like the strategy itself. The hedge
+    ratio is fitted once, except for a rolling hedge whose lookback follows the window.
+
+    Returns a DataFrame with one row per combination, ranked by Sharpe ratio.
+    """
+    hedge = hedge or {}
+    costs = costs or {}
+    # the spread depends on the window only through a rolling hedge left at its default lookback
+    per_window = hedge.get('method', 'static') == 'rolling' and hedge.get('hedge_window') is None
+    shared_df = None if per_window else _spread_frame(data1, data2, 2, hedge)
+
+    def make_task(window, thresholds):
+        spread_df = _spread_frame(data1, data2, window, hedge) if per_window else shared_df
+        return spread_df, window, thresholds, initial_capital, periods_per_year, costs
+
+    return run_window_sweep(_evaluate_window, params, make_task, max_workers)
+
+
+def grid_search(data1, data2, windows, entry_thresholds, exit_thresholds, initial_capital=100000,
+                max_workers=None, periods_per_year=252, costs=None, hedge=None):
+    """Backtests every combination of the given windows, entry and exit thresholds (see run_sweep)."""
+    params = grid_params(windows, entry_thresholds, exit_thresholds)
+    return run_sweep(data1, data2, params, initial_capital, max_workers, periods_per_year, costs, hedge)
+
+
+def random_search(data1, data2, n_samples, window_range=(10, 200), entry_range=(0.5, 3.0), exit_range=(0.0, 1.0),
+                  seed=None, initial_capital=100000, max_workers=None, periods_per_year=252, costs=None, hedge=None):
+    """
+    Backtests n_samples random combinations (see run_sweep): windows drawn as integers from
+    window_range (inclusive), thresholds uniformly from entry_range and exit_range.
+    """
+    params = random_params(n_samples, window_range, entry_range, exit_range, seed)
+    return run_sweep(data1, data2, params, initial_capital, max_workers, periods_per_year, costs, hedge)
@@ -0,0 +1,148 @@
+# Scanning a universe of tickers for cointegrated pairs
+# Every pair's hedge ratio and Engle-Granger test comes from a few moment matrices of the aligned
+# price matrix, so N tickers cost four matrix products instead of N(N-1)/2 separate regressions.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.adfvalues import mackinnonp
+
+from .data_loader import fetch_intraday_data
+
+
+def load_universe(tickers, start_date, end_date, timeframe, provider=None, max_workers=8):
+    """
+    Closing prices for many tickers, one column per ticker, on the union of their bar timestamps.
+    Tickers are fetched concurrently, since each fetch mostly waits on the network.
+    """
+    def fetch(ticker):
+        data = fetch_intraday_data(ticker, start_date, end_date, timeframe, provider=provider)
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = [col[0] for col in data.columns]
+        return data['Close'].rename(ticker)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        closes = list(pool.map(fetch, tickers))
+    return pd.concat(closes, axis=1)
+
+
+def engle_granger_matrix(prices):
+    """
+    Hedge ratios and Engle-Granger statistics for every ordered pair of columns of prices.
+
+    Entry [i, j] of each returned array describes the regression of column i on column j with an
+    intercept, followed by a Dickey-Fuller regression without lags (and without a constant, as in
+    statsmodels' coint) of the residual spread: diff(spread) = gamma * lagged spread.
+
+    Everything is expressed through centered moment matrices of the prices, their lags and their
+    first differences, so the matrix products (run on all cores by BLAS) do the heavy lifting.
+
+    Parameters:
+    - prices: Array or DataFrame of shape (bars, tickers) with no missing values
+
+    Returns:
+    - Dictionary of (tickers x tickers) arrays: 'hedge_ratio', 'intercept', 'adf_stat' and
+      'half_life' (in bars, from the AR(1) coefficient 1 + gamma; inf if the spread does not
+      mean-revert). Diagonal entries are NaN.
+    """
+    P = np.asarray(prices, dtype=float)
+    n = len(P) - 1
+
+    def moments(A, B):
+        # column means of A and B, and centered cross-products A_c' B_c
+        a_mean, b_mean = A.mean(axis=0), B.mean(axis=0)
+        return a_mean, b_mean, (A - a_mean).T @ (B - b_mean)
+
+    lagged, diffs = P[:-1], np.diff(P, axis=0)
+    mean, _, C = moments(P, P)
+    lag_mean, diff_mean, LD = moments(lagged, diffs)
+    LL = moments(lagged, lagged)[2]
+    DD = moments(diffs, diffs)[2]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # OLS of column i on column j: beta[i, j] = cov(i, j) / var(j)
+        beta = C / np.diag(C)[None, :]
+        alpha = mean[:, None] - beta * mean[None, :]
+
+        # lagged spread = u + k and its change = v + m, with u, v centered over the lagged sample
+        def quadratic(M):
+            # sum over bars of (a_i - beta a_j)(b_i - beta b_j), from the cross-product matrix M = A_c' B_c
+            diag = np.diag(M)
+            return diag[:, None] - beta * M - beta * M.T + beta ** 2 * diag[None, :]
+
+        var_u = quadratic(LL)
+        var_v = quadratic(DD)
+        cov_uv = quadratic(LD)
+        k = lag_mean[:, None] - alpha - beta * lag_mean[None, :]
+        m = diff_mean[:, None] - beta * diff_mean[None, :]
+
+        # uncentered sums of the no-constant Dickey-Fuller regression
+        s_ee = var_u + n * k ** 2
+        s_ed = cov_uv + n * k * m
+        s_dd = var_v + n * m ** 2
+
+        gamma = s_ed / s_ee
+        residual_variance = np.maximum(s_dd - gamma * s_ed, 0.0) / (n - 1)
+        adf_stat = gamma / np.sqrt(residual_variance / s_ee)
+        half_life = np.where((gamma < 0) & (gamma > -1), -np.log(2) / np.log1p(gamma), np.inf)
+
+    results = {'hedge_ratio': beta, 'intercept': alpha, 'adf_stat': adf_stat, 'half_life': half_life}
+    for values in results.values():
+        np.fill_diagonal(values, np.nan)
+    return results
+
+
+def scan_pairs(prices, top=20, min_coverage=0.95):
+    """
+    Ranks every pair of a universe by Engle-Granger cointegration.
+
+    Each pair is tested in both directions and keeps the one with the stronger (more negative)
+    ADF statistic; the first ticker is the dependent series, as data1 in zscore_calc.
+
+    Parameters:
+    - prices: DataFrame of closing prices, one column per ticker (e.g. from load_universe)
+    - top: Number of pairs to return
+    - min_coverage: Tickers with prices on fewer than this fraction of bars are left out;
+      the remaining bars with any missing price are dropped
+
+    Returns:
+    - DataFrame of the top pairs with 'ticker1', 'ticker2', 'hedge_ratio', 'intercept',
+      'adf_stat', 'pvalue' (MacKinnon approximate p-value) and 'half_life' (in bars)
+    """
+    prices = prices.loc[:, prices.notna().mean() >= min_coverage].dropna()
+    stats = engle_granger_matrix(prices)
+    adf_stat = stats['adf_stat']
+
+    # unordered pairs, each in its better-cointegrated direction
+    i, j = np.triu_indices(adf_stat.shape[0], k=1)
+    flip = adf_stat[j, i] < adf_stat[i, j]
+    y, x = np.where(flip, j, i), np.where(flip, i, j)
+    stat = adf_stat[y, x]
+
+    # the p-value is monotone in the statistic, so only the winners need one
+    order = np.argsort(np.where(np.isnan(stat), np.inf, stat))[:top]
+    y, x = y[order], x[order]
+    return pd.DataFrame({
+        'ticker1': prices.columns[y],
+        'ticker2': prices.columns[x],
+        'hedge_ratio': stats['hedge_ratio'][y, x],
+        'intercept': stats['intercept'][y, x],
+        'adf_stat': adf_stat[y, x],
+        'pvalue': [mackinnonp(t, regression='c', N=2) if np.isfinite(t) else np.nan for t in adf_stat[y, x]],
+        'half_life': stats['half_life'][y, x],
+    })
+
+
+def pair_zscores(prices, pairs, window_size=30):
+    """
+    Rolling z-scores of the spreads of scanned pairs, one column per pair ('TICKER1/TICKER2'),
+    computed as in zscore_calc with each pair's hedge ratio and intercept. The result feeds
+    signal_gen_batch directly.
+    """
+    spreads = pd.DataFrame({
+        f"{pair.ticker1}/{pair.ticker2}": prices[pair.ticker1] - (pair.hedge_ratio * prices[pair.ticker2] + pair.intercept)
+        for pair in pairs.itertuples()
+    })
+    rolling = spreads.rolling(window=window_size)
+    return (spreads - rolling.mean()) / rolling.std()
@@ -0,0 +1,110 @@
+# Portfolio backtest of many pair strategies on one aligned price matrix
+# Pairs are processed in column blocks: spreads, z-scores, positions and returns of a block are
+# matrices (bars x pairs) held in buffers reused from block to block, so memory stays flat however
+# many pairs run, and only the aggregate equity and per-pair summaries are kept.
+
+import numpy as np
+import pandas as pd
+
+from .signal_gen import latch_positions
+
+
+def run_portfolio(prices, pairs, window_size=30, entry_threshold=1.0, exit_threshold=0.3, initial_capital=100000,
+                  weights=None, rebalance=False, dtype=np.float64, block_size=64):
+    """
+    Backtests every pair of pairs together, each with the rules of signal_gen and backtest_strategy.
+
+    Parameters:
+    - prices: DataFrame of closing prices (bars x assets), aligned and without missing values
+    - pairs: DataFrame with 'ticker1', 'ticker2', 'hedge_ratio' and 'intercept' columns
+      (e.g. from scan_pairs)
+    - window_size, entry_threshold, exit_threshold: Z-score window and thresholds, as in zscore_calc
+      and signal_gen
+    - initial_capital: Starting capital of the whole portfolio
+    - weights: Capital share of each pair (normalized to sum to 1); equal shares if None
+    - rebalance: False lets each pair's capital compound on its own; True rebalances to the
+      weights every bar, so the portfolio return is the weighted mean of the pair returns
+    - dtype: np.float64, or np.float32 to halve the memory of the price and block buffers
+    - block_size: Pairs processed together
+
+    Returns:
+    - Dictionary with 'equity' (Series of portfolio value per bar), 'returns' (Series of
+      portfolio returns per bar) and 'pairs' (DataFrame with each pair's final value, PnL and
+      number of trades)
+    """
+    n_bars = len(prices)
+    columns = {ticker: k for k, ticker in enumerate(prices.columns)}
+    first = np.array([columns[t] for t in pairs['ticker1']])
+    second = np.array([columns[t] for t in pairs['ticker2']])
+    hedge = pairs['hedge_ratio'].to_numpy(dtype=dtype)
+    intercept = pairs['intercept'].to_numpy(dtype=dtype)
+    n_pairs = len(pairs)
+
+    weights = np.full(n_pairs, 1.0 / n_pairs) if weights is None else np.asarray(weights, dtype=float)
+    weights = (weights / weights.sum()).astype(dtype)
+
+    price = prices.to_numpy(dtype=dtype)
+    # log returns of every asset, computed once and shared by all pairs (the first bar has none)
+    log_return = np.log(price)
+    log_return[1:] -= log_return[:-1]
+    log_return[0] = 0.0
+
+    # reused block buffers
+    width = min(block_size, n_pairs)
+    spread = np.empty((n_bars, width), dtype=dtype)
+    pair_return = np.empty((n_bars, width), dtype=dtype)
+    scratch = np.empty((n_bars, width), dtype=dtype)
+
+    total = np.zeros(n_bars, dtype=np.float64)  # summed sleeve values, or weighted returns if rebalancing
+    final_value, trades = np.empty(n_pairs), np.empty(n_pairs, dtype=int)
+
+    for start in range(0, n_pairs, width):
+        block = slice(start, min(start + width, n_pairs))
+        k = block.stop - block.start
+        s, r, tmp = spread[:, :k], pair_return[:, :k], scratch[:, :k]
+
+        # spread = Y - (hedge_ratio * X + intercept), then its rolling z-score
+        np.take(price, first[block], axis=1, out=s)
+        np.take(price, second[block], axis=1, out=tmp)
+        tmp *= hedge[block]
+        tmp += intercept[block]
+        s -= tmp
+        rolling = pd.DataFrame(s).rolling(window=window_size)
+        zscore = ((s - rolling.mean().to_numpy()) / rolling.std().to_numpy())
+        signals, positions = latch_positions(zscore, entry_threshold, exit_threshold)
+        trades[block] = np.abs(signals).sum(axis=0)
+
+        # return of each pair: yesterday's position times (Ret_Y - hedge_ratio * Ret_X)
+        np.take(log_return, first[block], axis=1, out=r)
+        np.take(log_return, second[block], axis=1, out=tmp)
+        tmp *= hedge[block]
+        r -= tmp
+        r[1:] *= positions[:-1]
+        r[0] = 0.0
+
+        if rebalance:
+            total += r @ weights[block]
+            growth = np.cumprod(r + 1, axis=0, dtype=np.float64)[-1]
+        else:
+            # each pair's capital compounds on its own; the portfolio is the sum of the sleeves
+            r += 1
+            np.cumprod(r, axis=0, out=r)
+            r *= weights[block] * initial_capital
+            total += r.sum(axis=1, dtype=np.float64)
+            growth = r[-1] / (weights[block] * initial_capital)
+        final_value[block] = initial_capital * weights[block] * growth
+
+    if rebalance:
+        returns = total
+        equity = initial_capital * np.cumprod(1 + returns)
+    else:
+        equity = total
+        returns = np.concatenate([[0.0], equity[1:] / equity[:-1] - 1])
+
+    names = pairs['ticker1'] + '/' + pairs['ticker2']
+    return {
+        'equity': pd.Series(equity, index=prices.index),
+        'returns': pd.Series(returns, index=prices.index),
+        'pairs': pd.DataFrame({'final_value': final_value, 'pnl': final_value - initial_capital * weights,
+                               'trades': trades}, index=names.to_numpy())
+    }
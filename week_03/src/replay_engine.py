@@ -0,0 +1,179 @@
+# Event-driven replay of recorded bars across several tickers
+# Bar streams are merged by timestamp in a heap-based k-way merge and stamped with the exchange
+# session they belong to (local trading day, regular hours only), so rolling state can be reset or
+# carried at session breaks instead of windows silently straddling the overnight gap. replay_bulk
+# computes the same result for one pair with whole-array operations, for long histories.
+
+import heapq
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import SESSIONS, market_of
+from .signal_gen import latch_positions
+
+NS_PER_DAY = 86_400 * 10**9
+OUTPUT_COLUMNS = ['Spread', 'ZScore', 'Signal', 'Position']
+
+
+def session_calendar(index, market):
+    """
+    Session of each bar of a DatetimeIndex (naive timestamps are taken to be UTC).
+
+    Returns (stamps, session, in_session): UTC nanoseconds, the local trading day (days since
+    1970-01-01 in the exchange time zone) and whether the bar starts within regular hours on a
+    weekday. Exchange holidays are not modelled; there are simply no bars on them.
+    """
+    open_time, close_time, tz = SESSIONS[market]
+    index = pd.DatetimeIndex(index).as_unit('ns')
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    stamps = index.asi8
+    wall = index.tz_convert(tz).tz_localize(None).asi8  # local wall-clock time
+
+    session = wall // NS_PER_DAY
+    time_of_day = wall - session * NS_PER_DAY
+    in_session = ((time_of_day >= pd.Timedelta(f'{open_time}:00').value)
+                  & (time_of_day < pd.Timedelta(f'{close_time}:00').value)
+                  & ((session + 3) % 7 < 5))  # 1970-01-01 was a Thursday
+    return stamps, session, in_session
+
+
+def merge_streams(streams, market):
+    """
+    Merges bar streams into one timestamp-ordered event stream with a heap (k-way merge).
+
+    streams maps each ticker to a bar DataFrame with a 'Close' column. Bars outside regular
+    hours are dropped. Yields (timestamp_ns, stream_number, session, close) tuples, stream_number
+    being the ticker's position in streams; bars sharing a timestamp come out in stream order.
+    """
+    iterators = []
+    for k, data in enumerate(streams.values()):
+        stamps, session, in_session = session_calendar(data.index, market)
+        order = np.argsort(stamps[in_session], kind='stable')
+        close = data['Close'].to_numpy(dtype=float)[in_session][order]
+        iterators.append(zip(stamps[in_session][order].tolist(), itertools.repeat(k),
+                             session[in_session][order].tolist(), close.tolist()))
+    return heapq.merge(*iterators)
+
+
+class ReplayEngine:
+    """
+    Replays recorded bars of many tickers in timestamp order through one StreamingZScore per pair.
+
+    Parameters:
+    - market: 'NSE' or 'US' (see data_loader.SESSIONS); None takes the market of the first pair
+    - session_break: 'reset' empties each pair's rolling window and flattens its position at the
+      first bar of every session; 'carry' keeps both across the overnight gap
+    - fill: 'drop' updates a pair only on timestamps where both legs have a bar; 'ffill' also
+      updates it when one leg has a bar, using the other leg's last price of the same session
+    """
+
+    def __init__(self, market=None, session_break='reset', fill='drop'):
+        if session_break not in ('reset', 'carry'):
+            raise ValueError("Invalid session_break. Use 'reset' or 'carry'.")
+        if fill not in ('drop', 'ffill'):
+            raise ValueError("Invalid fill. Use 'drop' or 'ffill'.")
+        self.market = market
+        self.session_break = session_break
+        self.fill = fill
+        self.pairs = {}  # (ticker1, ticker2) -> StreamingZScore
+
+    def add_pair(self, ticker1, ticker2, engine):
+        """Trades ticker1 against ticker2 with engine (a StreamingZScore)."""
+        if self.market is None:
+            self.market = market_of(ticker1)
+        self.pairs[(ticker1, ticker2)] = engine
+
+    def run(self, streams):
+        """
+        Replays streams (ticker -> bar DataFrame with a 'Close' column, e.g. from
+        fetch_intraday_data) through every pair.
+
+        Returns a dictionary mapping (ticker1, ticker2) to a DataFrame with 'Spread', 'ZScore',
+        'Signal' and 'Position' per bar the pair was updated, indexed in exchange time.
+        """
+        slot = {ticker: k for k, ticker in enumerate(streams)}
+        legs = [(slot[ticker1], slot[ticker2], engine, []) for (ticker1, ticker2), engine in self.pairs.items()]
+        reset = self.session_break == 'reset'
+        ffill = self.fill == 'ffill'
+
+        nan = float('nan')
+        last = [nan] * len(streams)  # last close of each stream in the current session
+        printed = [False] * len(streams)  # which streams have a bar at the current timestamp
+
+        def step(stamp):
+            for k1, k2, engine, rows in legs:
+                if (printed[k1] and printed[k2]) or (ffill and (printed[k1] or printed[k2])
+                                                     and last[k1] == last[k1] and last[k2] == last[k2]):
+                    rows.append((stamp, *engine.update(last[k1], last[k2])))
+
+        current_stamp = current_session = None
+        for stamp, k, session, close in merge_streams(streams, self.market):
+            if stamp != current_stamp:
+                if current_stamp is not None:
+                    step(current_stamp)
+                    printed = [False] * len(streams)
+                if session != current_session:
+                    # new session: yesterday's prices never fill today's bars
+                    last = [nan] * len(streams)
+                    if reset and current_session is not None:
+                        for _, _, engine, _ in legs:
+                            engine.reset_session()
+                    current_session = session
+                current_stamp = stamp
+            last[k] = close
+            printed[k] = True
+        if current_stamp is not None:
+            step(current_stamp)
+
+        tz = SESSIONS[self.market][2]
+        results = {}
+        for pair, (_, _, _, rows) in zip(self.pairs, legs):
+            frame = pd.DataFrame(rows, columns=['Timestamp'] + OUTPUT_COLUMNS)
+            frame.index = pd.to_datetime(frame.pop('Timestamp'), utc=True).dt.tz_convert(tz).rename(None)
+            results[pair] = frame
+        return results
+
+
+def replay_bulk(data1, data2, engine, market='US', session_break='reset', fill='drop'):
+    """
+    Same result as a ReplayEngine holding one pair, computed with whole-array operations.
+
+    engine supplies the window, thresholds, hedge ratio and intercept and is left untouched;
+    market, session_break and fill are as in ReplayEngine.
+    Returns a DataFrame with 'Spread', 'ZScore', 'Signal' and 'Position', indexed in exchange time.
+    """
+    tz = SESSIONS[market][2]
+
+    legs = []
+    for data in (data1, data2):
+        stamps, _, in_session = session_calendar(data.index, market)
+        legs.append(pd.Series(data['Close'].to_numpy(dtype=float)[in_session], index=stamps[in_session]).sort_index())
+    prices = pd.concat(legs, axis=1, join='inner' if fill == 'drop' else 'outer').sort_index()
+
+    index = pd.to_datetime(prices.index.to_numpy(), utc=True).tz_convert(tz)
+    _, session, _ = session_calendar(index, market)
+    if fill == 'ffill':
+        prices = prices.groupby(session).ffill()  # within the session only
+        complete = prices.notna().all(axis=1).to_numpy()
+        prices, index, session = prices[complete], index[complete], session[complete]
+
+    price1, price2 = prices[0].to_numpy(), prices[1].to_numpy()
+    spread = price1 - (engine.hedge_ratio * price2 + engine.intercept)
+    rolling = pd.Series(spread).rolling(window=engine.window_size)
+    std = rolling.std().to_numpy()
+    zscore = (spread - rolling.mean().to_numpy()) / np.where(std > 0, std, np.nan)
+
+    resets = None
+    if session_break == 'reset':
+        # a window is valid once it holds window_size bars of the current session
+        resets = np.concatenate([[False], session[1:] != session[:-1]])
+        bars = np.arange(len(spread))
+        bars_into_session = bars - np.maximum.accumulate(np.where(resets, bars, 0))
+        zscore[bars_into_session < engine.window_size - 1] = np.nan
+    signals, positions = latch_positions(zscore, engine.entry_threshold, engine.exit_threshold, resets)
+
+    return pd.DataFrame({'Spread': spread, 'ZScore': zscore, 'Signal': signals.astype(int),
+                         'Position': positions.astype(int)}, index=index)
@@ -3,32 +3,99 @@
 import numpy as np
 import pandas as pd
 
+# Transition maps of the position state machine, for thresholds where a bar can both open and
+# close a trade (exit_threshold > entry_threshold). Positions are stored as 0, 1, 2 (= position + 1)
+# and a map f is coded as the integer f(0) + 3 f(1) + 9 f(2); _COMPOSE[27 g + f] codes "f, then g".
+_MAPS = np.array([[code % 3, code // 3 % 3, code // 9] for code in range(27)])
+_COMPOSE = np.array([[_MAPS[g][_MAPS[f]] @ [1, 3, 9] for f in range(27)] for g in range(27)]).ravel()
+
+
+def _latch(z, entry_threshold, exit_threshold, resets):
+    """Positions when exits and entries can't fall on the same bar (exit_threshold <= entry_threshold)."""
+    n = z.shape[0]
+    bars = np.arange(n).reshape((n,) + (1,) * (z.ndim - 1))
+
+    # a bar inside the exit band flattens any position (as does a reset, just before its bar); an entry
+    # bar decides the direction of the position only if it is the first entry since the last exit
+    entry = np.where(z > entry_threshold, -1, np.where(z < -entry_threshold, 1, 0)).astype(np.int8)
+    last_exit = np.where(np.abs(z) < exit_threshold, bars, np.where(resets, bars - 1, -1))
+    last_exit = np.maximum.accumulate(last_exit, axis=0)
+    next_entry = np.minimum.accumulate(np.where(entry != 0, bars, n)[::-1], axis=0)[::-1]
+    next_entry = np.concatenate([next_entry, np.full((1,) + z.shape[1:], n)])
+
+    first_entry = np.take_along_axis(next_entry, last_exit + 1, axis=0)
+    direction = np.take_along_axis(entry, np.minimum(first_entry, n - 1), axis=0)
+    return np.where(first_entry <= bars, direction, 0).astype(np.int8)
+
+
+def _scan(z, entry_threshold, exit_threshold, resets):
+    """Positions for any thresholds, from a prefix scan over each bar's transition map."""
+    exits = np.abs(z) < exit_threshold
+    from_flat = np.where(z > entry_threshold, 0, np.where(z < -entry_threshold, 2, 1))
+    # a reset bar starts from flat whatever the position before it
+    from_short = np.where(resets, from_flat, np.where(exits, 1, 0))
+    from_long = np.where(resets, from_flat, np.where(exits, 1, 2))
+    prefix = from_short + 3 * from_flat + 9 * from_long
+
+    # Hillis-Steele inclusive scan along the bars: log2(n) passes of table lookups
+    offset = 1
+    while offset < len(prefix):
+        prefix[offset:] = _COMPOSE[27 * prefix[offset:] + prefix[:-offset]]
+        offset *= 2
+    return (_MAPS[prefix, 1] - 1).astype(np.int8)
+
+
+def latch_positions(zscore, entry_threshold=1.0, exit_threshold=0.3, resets=None):
+    """
+    Signals and positions for an array of z-scores, without a Python loop over bars.
+
+    Same rules as the bar-by-bar state machine: when flat, enter short above entry_threshold and
+    long below -entry_threshold; when in a trade, exit once |z| < exit_threshold. The signal is the
+    new position on entry bars and 0 otherwise. NaN z-scores leave the position unchanged.
+
+    zscore has bars along axis 0; a 2-D array (bars x pairs) runs every pair in one call.
+    resets optionally flags bars (boolean, one per bar) before which the position is forced
+    flat, e.g. the first bar of each trading session.
+    Returns (signals, positions), int8 arrays of the same shape as zscore.
+    """
+    z = np.asarray(zscore, dtype=float)
+    resets = np.zeros(z.shape[0], dtype=bool) if resets is None else np.asarray(resets, dtype=bool)
+    resets = resets.reshape((-1,) + (1,) * (z.ndim - 1))
+    if z.shape[0] == 0:
+        return np.zeros(z.shape, dtype=np.int8), np.zeros(z.shape, dtype=np.int8)
+
+    if exit_threshold <= entry_threshold:
+        positions = _latch(z, entry_threshold, exit_threshold, resets)
+    else:
+        positions = _scan(z, entry_threshold, exit_threshold, resets)
+
+    previous = np.concatenate([np.zeros((1,) + z.shape[1:], dtype=np.int8), positions[:-1]])
+    previous = np.where(resets, 0, previous)
+    signals = np.where(previous == 0, positions, 0).astype(np.int8)
+    return signals, positions
+
+
 def signal_gen(zscore_df, entry_threshold=1.0, exit_threshold=0.3):
     df = zscore_df.copy()
     df.dropna(subset=['ZScore'], inplace=True)  # Ensure no NaN values in ZScore
-    signals = []
-    positions = []
-    current_position = 0  # 1 for long, -1 for short, 0 for neutral
-
-    for z in df['ZScore']:
-        signal = 0  # Default no signal
-
-        if current_position == 0:  # No open position
-            if z > entry_threshold:  # Short signal: short Y, long X
-                signal = -1
-                current_position = -1
-            elif z < -entry_threshold:  # Long signal: long Y, short X
-                signal = 1
-                current_position = 1
-        else:
-            if abs(z) < exit_threshold:
-                signal = 0 # Exit signal
-                current_position = 0
-
-        signals.append(signal)
-        positions.append(current_position)
-
-    df["Signal"] = signals
-    df["Position"] = positions
-
-    return df
\ No newline at end of file
+
+    # 1 for long, -1 for short, 0 for neutral
+    signals, positions = latch_positions(df['ZScore'].to_numpy(), entry_threshold, exit_threshold)
+
+    df["Signal"] = signals.astype(int)
+    df["Position"] = positions.astype(int)
+
+    return df
+
+
+def signal_gen_batch(zscores, entry_threshold=1.0, exit_threshold=0.3):
+    """
+    Signals and positions for many pairs at once.
+
+    zscores is a DataFrame with one z-score column per pair on a shared bar index. NaN bars
+    (e.g. a pair's warm-up window) are skipped as signal_gen skips them.
+    Returns (signals, positions): DataFrames shaped like zscores.
+    """
+    signals, positions = latch_positions(zscores.to_numpy(), entry_threshold, exit_threshold)
+    return (pd.DataFrame(signals.astype(int), index=zscores.index, columns=zscores.columns),
+            pd.DataFrame(positions.astype(int), index=zscores.index, columns=zscores.columns))
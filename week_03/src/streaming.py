@@ -0,0 +1,126 @@
+# Streaming z-score engine for live bars
+# Each bar updates the spread's rolling mean and variance in O(1) from a ring buffer (a sliding
+# Welford update), then runs the signal_gen state machine on the new z-score.
+
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+
+class StreamingZScore:
+    """
+    Online spread z-score and signals, one bar at a time.
+
+    Parameters:
+    - window_size: Bars in the rolling mean and standard deviation (sample, ddof=1, as in pandas)
+    - entry_threshold, exit_threshold: Same meaning as in signal_gen
+    - hedge_ratio, intercept: The spread is price1 - (hedge_ratio * price2 + intercept)
+    """
+
+    def __init__(self, window_size=30, entry_threshold=1.0, exit_threshold=0.3, hedge_ratio=1.0, intercept=0.0):
+        self.window_size = window_size
+        self.entry_threshold = entry_threshold
+        self.exit_threshold = exit_threshold
+        self.hedge_ratio = hedge_ratio
+        self.intercept = intercept
+
+        self.buffer = [0.0] * window_size  # last window_size spreads
+        self.head = 0  # slot the next spread goes into
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+        self.position = 0  # 1 for long, -1 for short, 0 for neutral
+
+    def update(self, price1, price2):
+        """
+        Adds one bar. Returns (spread, zscore, signal, position); zscore is NaN until the
+        window is full (and then signal is 0 and the position unchanged).
+        """
+        spread = price1 - (self.hedge_ratio * price2 + self.intercept)
+        n = self.window_size
+
+        if self.count < n:
+            # still filling the window: plain Welford update
+            self.count += 1
+            delta = spread - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (spread - self.mean)
+        else:
+            # full window: the new spread replaces the oldest one
+            old = self.buffer[self.head]
+            old_mean = self.mean
+            self.mean += (spread - old) / n
+            self.m2 += (spread - old) * (spread - self.mean + old - old_mean)
+
+        self.buffer[self.head] = spread
+        self.head += 1
+        if self.head == n:
+            self.head = 0
+            if self.count == n:
+                self._resync()
+
+        if self.count < n or n < 2:
+            return spread, math.nan, 0, self.position
+        variance = self.m2 / (n - 1)
+        zscore = (spread - self.mean) / math.sqrt(variance) if variance > 0 else math.nan
+
+        return (spread, zscore, *self._signal(zscore))
+
+    def reset_session(self):
+        """Starts a new session: empties the rolling window and flattens the position."""
+        self.buffer = [0.0] * self.window_size
+        self.head = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.position = 0
+
+    def _resync(self):
+        # recompute the window statistics exactly once per pass through the buffer, so rounding
+        # errors from the sliding updates never build up (O(1) per bar on average)
+        self.mean = math.fsum(self.buffer) / self.window_size
+        self.m2 = math.fsum((value - self.mean) ** 2 for value in self.buffer)
+
+    def _signal(self, z):
+        # signal_gen's state machine, one bar at a time; NaN z-scores leave everything unchanged
+        signal = 0
+        if self.position == 0:
+            if z > self.entry_threshold:  # Short signal: short Y, long X
+                signal = self.position = -1
+            elif z < -self.entry_threshold:  # Long signal: long Y, short X
+                signal = self.position = 1
+        elif abs(z) < self.exit_threshold:
+            self.position = 0
+        return signal, self.position
+
+
+def replay(data1, data2, engine):
+    """
+    Drives a StreamingZScore with recorded bars, as if they arrived live.
+
+    Parameters:
+    - data1, data2: Bar DataFrames with a 'Close' column (e.g. from fetch_intraday_data, which
+      serves repeated ranges from the on-disk cache)
+    - engine: The StreamingZScore to feed
+
+    Returns:
+    - DataFrame with 'Spread', 'ZScore', 'Signal', 'Position' and 'LatencyMicros' (time spent
+      in engine.update) per bar, indexed like the aligned bars
+    """
+    data1, data2 = data1.align(data2, join='inner', axis=0)
+    prices1 = data1['Close'].to_numpy(dtype=float).tolist()
+    prices2 = data2['Close'].to_numpy(dtype=float).tolist()
+
+    rows = []
+    latencies = []
+    clock = time.perf_counter
+    for price1, price2 in zip(prices1, prices2):
+        start = clock()
+        rows.append(engine.update(price1, price2))
+        latencies.append(clock() - start)
+
+    result = pd.DataFrame(rows, columns=['Spread', 'ZScore', 'Signal', 'Position'], index=data1.index)
+    result['LatencyMicros'] = np.array(latencies) * 1e6
+    return result
@@ -3,29 +3,53 @@ import numpy as np
 import pandas as pd
 import statsmodels.api as sm
 
-def zscore_calc(data1, data2, window_size = 30):
-    """Calculate the hedge ratio using linear regression."""
+from .hedge_ratio import rolling_ols, kalman_hedge_ratio
+
+def zscore_calc(data1, data2, window_size = 30, method = "static", hedge_window = None, kalman_delta = 1e-4,
+                kalman_obs_var = 1e-3):
+    """
+    Calculate the hedge ratio, spread and rolling z-score of a pair.
+
+    method selects the hedge ratio: "static" fits one linear regression over the whole sample
+    (returns floats), "rolling" uses rolling OLS over hedge_window bars (defaults to 10 x
+    window_size) and "kalman" a Kalman filter with state noise kalman_delta and observation noise
+    variance kalman_obs_var; these two return per-bar Series that only use data up to each bar
+    (the Kalman spread is the prediction error of the estimate from the bars before).
+    """
     # Ensure data is aligned
     data1, data2 = data1.align(data2, join='inner', axis=0)
     
     Y = data1["Close"]
     X = data2["Close"]
 
-    #  Run a Linear Regression
-    X = sm.add_constant(X)  # Add a constant term for the intercept
-    model = sm.OLS(Y, X).fit()
-    hedge_ratio = model.params.iloc[1]  # The slope coefficient is the hedge ratio
-    intercept = model.params.iloc[0]  # The intercept
-    
-    spread = Y - (hedge_ratio * X.iloc[:, 1] + intercept)
+    if method == "static":
+        #  Run a Linear Regression
+        X = sm.add_constant(X)  # Add a constant term for the intercept
+        model = sm.OLS(Y, X).fit()
+        hedge_ratio = model.params.iloc[1]  # The slope coefficient is the hedge ratio
+        intercept = model.params.iloc[0]  # The intercept
+        X = X.iloc[:, 1]  # Remove constant
+        spread = Y - (hedge_ratio * X + intercept)
+    elif method in ("rolling", "kalman"):
+        if method == "rolling":
+            hedge, alpha, spread = rolling_ols(Y.to_numpy(), X.to_numpy(), hedge_window or 10 * window_size)
+        else:
+            hedge, alpha, spread = kalman_hedge_ratio(Y.to_numpy(), X.to_numpy(), delta=kalman_delta,
+                                                      obs_var=kalman_obs_var)
+        hedge_ratio = pd.Series(hedge, index=Y.index)
+        intercept = pd.Series(alpha, index=Y.index)
+        spread = pd.Series(spread, index=Y.index)
+    else:
+        raise ValueError("Invalid method. Use 'static', 'rolling' or 'kalman'.")
+
     rolling_mean = spread.rolling(window=window_size).mean()
     rolling_std = spread.rolling(window=window_size).std()
     
     zscore = (spread - rolling_mean) / rolling_std
-    print(zscore)
     result_df = pd.DataFrame({
         "Close_data1": Y,
-        "Close_data2": X.iloc[:, 1],  # Remove constant
+        "Close_data2": X,
+        "HedgeRatio": hedge_ratio,
         "Spread": spread,
         "ZScore": zscore,
         "RollingMean": rolling_mean,
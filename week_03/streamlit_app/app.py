@@ -4,10 +4,13 @@ import pandas as pd
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# the shared quant_common package lives at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 from src.data_loader import fetch_intraday_data
 from src.zscore import zscore_calc 
 from src.signal_gen import signal_gen
 from src.backtesting import backtest_strategy
+from src.optimizer import grid_search
 
 st.set_page_config(page_title = "Intraday Statistical Arbitrage Strategy Explorer", layout = "wide")
 
@@ -60,13 +63,31 @@ start_date = st.sidebar.date_input("Start Date", end_date - timedelta(days=perio
 rolling_window = int(st.sidebar.slider("Select Rolling Window (in bars)", min_value=10, max_value=max_rolling_window))
 entry_threshold = float(st.sidebar.text_input("Entry Threshold", value="1.0", help="Z-score threshold for entering trades."))
 exit_threshold = float(st.sidebar.text_input("Exit Threshold", value="0.3", help="Z-score threshold for exiting trades."))
+hedge_methods = {"Static OLS": "static", "Rolling OLS": "rolling", "Kalman Filter": "kalman"}
+hedge_method = st.sidebar.selectbox("Hedge Ratio", options=list(hedge_methods), help="Static fits the whole period; rolling OLS (over 10x the rolling window) and the Kalman filter only use past bars.")
+hedge = {"method": hedge_methods[hedge_method]}
+if hedge["method"] == "kalman":
+    hedge["kalman_delta"] = float(st.sidebar.text_input("Kalman State Noise (delta)", value="0.0001", help="Larger values let the hedge ratio move faster."))
+    hedge["kalman_obs_var"] = float(st.sidebar.text_input("Kalman Observation Variance", value="0.001", help="Noise variance of the first stock's price around the fitted value, in squared price units."))
+sweep = st.sidebar.checkbox("Parameter Sweep", help="Also grid-search the rolling window and thresholds, ranked by Sharpe ratio.")
 
 # Capital and sizing
 if market == "India":
     capital = st.sidebar.number_input("Initial Capital (₹)", min_value=10000, value=100000, step=1000)
 else:
     capital = st.sidebar.number_input("Initial Capital ($)", min_value=1000, value=10000, step=100)
-# sizing_method = st.sidebar.radio("Position Sizing", ["Fixed Lot", "Proportional"])
+sizing_method = st.sidebar.radio("Position Sizing", ["Fixed Lot", "Proportional"], index=1, help="Fixed lot trades a set number of shares; proportional stakes the current capital.")
+lot_size = int(st.sidebar.number_input("Lot Size (shares of first stock)", min_value=1, value=100, step=1)) if sizing_method == "Fixed Lot" else 100
+
+# Execution costs
+commission = st.sidebar.number_input("Commission per Order", min_value=0.0, value=0.0, step=0.5)
+slippage_bps = st.sidebar.number_input("Slippage (bps of traded notional)", min_value=0.0, value=0.0, step=0.5)
+borrow_rate = st.sidebar.number_input("Borrow Cost (% per year on the short leg)", min_value=0.0, value=0.0, step=0.25) / 100
+
+session_minutes = 375 if market == "India" else 390
+bars_per_year = 252 * session_minutes // int(timeframe.rstrip("m"))
+costs = {"commission": commission, "slippage_bps": slippage_bps, "borrow_rate": borrow_rate,
+         "sizing": "fixed_lot" if sizing_method == "Fixed Lot" else "proportional", "lot_size": lot_size}
 
 # # ML Toggle
 # use_ml = st.sidebar.checkbox("🧠 Use ML Filter for Signal Confirmation")
@@ -95,10 +116,14 @@ if run_button:
 
     st.info(f"Fetched data for {ticker1} and {ticker2} from {start_date} to {end_date} at {timeframe} intervals.")
 
-    zscore_df, hedge_ratio, intercept = zscore_calc(data1, data2, window_size=rolling_window)
+    zscore_df, hedge_ratio, intercept = zscore_calc(data1, data2, window_size=rolling_window, **hedge)
     zscore_df = zscore_df.dropna(subset=['ZScore'])  # Drop rows with NaN Z-Score
     # st.dataframe(zscore_df, use_container_width=True)
-    st.write(f"Hedge Ratio: {hedge_ratio:.4f}, Intercept: {intercept:.4f}")
+    if hedge_methods[hedge_method] == "static":
+        st.write(f"Hedge Ratio: {hedge_ratio:.4f}, Intercept: {intercept:.4f}")
+    else:
+        st.write(f"Latest Hedge Ratio: {hedge_ratio.iloc[-1]:.4f}, Intercept: {intercept.iloc[-1]:.4f}")
+        st.line_chart(hedge_ratio.dropna(), use_container_width=True)
 
     # Generate signals based on Z-Score
     signals_df = signal_gen(zscore_df, entry_threshold, exit_threshold)
@@ -106,7 +131,7 @@ if run_button:
     # st.dataframe(signals_df, use_container_width=True)
 
     # Backtest the strategy
-    backtest_df = backtest_strategy(signals_df, hedge_ratio, capital)
+    backtest_df = backtest_strategy(signals_df, hedge_ratio, capital, periods_per_year=bars_per_year, **costs)
     st.header("💵 Cumulative Returns")
     st.line_chart(backtest_df['portfolio_value'], use_container_width=True)
     if market == "India":
@@ -116,8 +141,17 @@ if run_button:
         st.write(f"Final Portfolio Value: ${backtest_df['portfolio_value'].iloc[-1]:.2f}")
         st.write(f"Total PnL: ${backtest_df['portfolio_value'].iloc[-1] - capital}")
     st.write(f"Total Trades Executed: {backtest_df['Signal'].abs().sum()}")
+    st.write(f"Total Trading Costs: {backtest_df['Costs'].sum():.2f}")
     st.header("📈 Backtest Results")
     st.dataframe(backtest_df[['Close_data1', 'Close_data2', 'Spread', 'ZScore', 'Signal', 'Position', 'portfolio_value']], use_container_width=True)
 
+    if sweep:
+        st.header("🔍 Parameter Sweep")
+        sweep_df = grid_search(data1, data2, range(10, max_rolling_window + 1, 10), [x / 4 for x in range(2, 13)],
+                               [x / 10 for x in range(0, 11)], initial_capital=capital, periods_per_year=bars_per_year,
+                               costs=costs, hedge=hedge)
+        st.write(f"Top 20 of {len(sweep_df)} combinations, ranked by Sharpe ratio:")
+        st.dataframe(sweep_df.head(20), use_container_width=True)
+
 else:
     st.info("Configure strategy settings in the sidebar and click **Run Strategy**.")
\ No newline at end of file